@@ -18,9 +18,12 @@ from ..utils import all_decks, load_yaml
 
 
 class ImagesAnalyzer:
-    def __init__(self, shared_dir: Path, git_dir: Path) -> None:
+    def __init__(
+        self, shared_dir: Path, git_dir: Path, index_path: Path | None = None
+    ) -> None:
         self._shared_dir = shared_dir
         self._git_dir = git_dir
+        self._index_path = index_path
 
     def sections_unlicensed_images(self) -> dict[UnresolvedPath, frozenset[Path]]:
         return {
@@ -32,7 +35,7 @@ class ImagesAnalyzer:
 
     @cached_property
     def _decks(self) -> dict[Path, Deck]:
-        return all_decks(self._git_dir)
+        return all_decks(self._git_dir, self._index_path)
 
     @property
     def _section_dependencies(self) -> dict[UnresolvedPath, set[ResolvedPath]]:
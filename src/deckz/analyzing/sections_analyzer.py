@@ -18,9 +18,12 @@ from ..utils import all_decks, load_yaml
 
 
 class SectionsAnalyzer:
-    def __init__(self, shared_latex_dir: Path, git_dir: Path) -> None:
+    def __init__(
+        self, shared_latex_dir: Path, git_dir: Path, index_path: Path | None = None
+    ) -> None:
         self._shared_latex_dir = shared_latex_dir
         self._git_dir = git_dir
+        self._index_path = index_path
 
     def unused_flavors(self) -> dict[UnresolvedPath, set[FlavorName]]:
         unused_flavors = {
@@ -54,7 +57,7 @@ class SectionsAnalyzer:
 
     @cached_property
     def _decks(self) -> dict[Path, Deck]:
-        return all_decks(self._git_dir)
+        return all_decks(self._git_dir, self._index_path)
 
     @cached_property
     def _shared_sections(self) -> dict[UnresolvedPath, SectionDefinition]:
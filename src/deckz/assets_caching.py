@@ -0,0 +1,141 @@
+"""Store produced assets under the digest of their inputs, across repositories.
+
+The assets builders decide whether an asset is stale from the digest of its inputs \
+(see the manifests of [`deckz.components.assets_building`][]). The cache maps those \
+digests to the PDFs produced, so that an asset built once, in another clone or on \
+another branch, is copied instead of built again.
+
+The cache can be exported to and imported from a tarball, to seed CI runners or new \
+clones. It is bounded in size: the least recently used assets are evicted first. The \
+PDFs compiled for the decks are cached the same way, in their own directory.
+"""
+
+from contextlib import suppress
+from logging import getLogger
+from os import getpid, utime
+from pathlib import Path
+from re import compile as re_compile
+from shutil import copyfile
+
+_logger = getLogger(__name__)
+
+_ENTRY_NAME = re_compile(r"[0-9a-f]{64}\.pdf")
+
+
+class AssetsCache:
+    """Produced assets, stored under the digest of their inputs."""
+
+    def __init__(self, path: Path, max_size: int | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Directory storing the assets. Created if needed.
+            max_size: Size in bytes above which the least recently used assets are \
+                evicted. The cache is unbounded if None.
+        """
+        self._path = path
+        self._max_size = max_size
+
+    def restore(self, digest: str, target: Path) -> bool:
+        """Copy a cached asset if there is one for a digest.
+
+        Args:
+            digest: Digest of the inputs of the asset.
+            target: Path to copy the asset to.
+
+        Returns:
+            True if the asset was cached, False otherwise.
+        """
+        entry = self._entry(digest)
+        try:
+            # Restoring an asset makes it the most recently used one
+            utime(entry)
+        except FileNotFoundError:
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        copyfile(entry, target)
+        return True
+
+    def store(self, digest: str, source: Path) -> None:
+        """Add an asset to the cache.
+
+        Args:
+            digest: Digest of the inputs of the asset.
+            source: Path of the asset.
+        """
+        entry = self._entry(digest)
+        self._path.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry.with_name(f"{entry.name}.{getpid()}.tmp")
+        copyfile(source, tmp_path)
+        tmp_path.replace(entry)
+
+    def evict(self) -> None:
+        """Remove the least recently used assets until the cache fits its size."""
+        if self._max_size is None:
+            return
+        entries = []
+        for entry in self._entries():
+            with suppress(FileNotFoundError):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        entries.sort()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        evicted = 0
+        for _, entry_size, entry in entries:
+            if size <= self._max_size:
+                break
+            entry.unlink(missing_ok=True)
+            size -= entry_size
+            evicted += 1
+        if evicted:
+            _logger.info("Evicted %d file(s) from the cache %s", evicted, self._path)
+
+    def export_archive(self, archive: Path) -> int:
+        """Write the cached assets to a compressed tarball.
+
+        Args:
+            archive: Path of the tarball to write.
+
+        Returns:
+            Number of assets exported.
+        """
+        from tarfile import open as tar_open
+
+        entries = list(self._entries())
+        with tar_open(archive, "w:gz") as tar:
+            for entry in entries:
+                tar.add(entry, arcname=entry.name)
+        return len(entries)
+
+    def import_archive(self, archive: Path) -> int:
+        """Add the assets of a tarball written by `export_archive` to the cache.
+
+        Members that are not assets are ignored. Eviction happens at the next build.
+
+        Args:
+            archive: Path of the tarball to read.
+
+        Returns:
+            Number of assets imported.
+        """
+        from tarfile import open as tar_open
+
+        self._path.mkdir(parents=True, exist_ok=True)
+        with tar_open(archive, "r:*") as tar:
+            members = [
+                member
+                for member in tar.getmembers()
+                if member.isfile() and _ENTRY_NAME.fullmatch(member.name)
+            ]
+            tar.extractall(self._path, members=members, filter="data")
+        return len(members)
+
+    def _entries(self) -> list[Path]:
+        if not self._path.is_dir():
+            return []
+        return [
+            entry for entry in self._path.iterdir() if _ENTRY_NAME.fullmatch(entry.name)
+        ]
+
+    def _entry(self, digest: str) -> Path:
+        return self._path / f"{digest}.pdf"
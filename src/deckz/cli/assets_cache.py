@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from cyclopts import App
+
+from . import app
+
+assets_cache = App(name="assets-cache")
+app.command(assets_cache)
+
+
+@assets_cache.command()
+def export(archive: Path, /, *, workdir: Path = Path()) -> None:
+    """Write the assets cache to a tarball.
+
+    Args:
+        archive: Path of the tarball to write
+        workdir: Path to move into before running the command
+
+    """
+    from logging import getLogger
+
+    from ..assets_caching import AssetsCache
+    from ..configuring.settings import GlobalSettings
+
+    settings = GlobalSettings.from_yaml(workdir)
+    count = AssetsCache(settings.paths.assets_cache_dir).export_archive(archive)
+    getLogger(__name__).info(f"Exported {count} asset(s) to {archive}")
+
+
+@assets_cache.command(name="import")
+def import_(archive: Path, /, *, workdir: Path = Path()) -> None:
+    """Add the assets of a tarball written by assets-cache export to the cache.
+
+    Args:
+        archive: Path of the tarball to read
+        workdir: Path to move into before running the command
+
+    """
+    from logging import getLogger
+
+    from ..assets_caching import AssetsCache
+    from ..configuring.settings import GlobalSettings
+
+    settings = GlobalSettings.from_yaml(workdir)
+    count = AssetsCache(settings.paths.assets_cache_dir).import_archive(archive)
+    getLogger(__name__).info(f"Imported {count} asset(s) from {archive}")
@@ -1,4 +1,7 @@
 from pathlib import Path
+from typing import Annotated
+
+from cyclopts import Parameter, validators
 
 from . import app
 
@@ -9,6 +12,9 @@ def check_all(
     handout: bool = False,
     presentation: bool = True,
     print: bool = False,  # noqa: A002
+    jobs: Annotated[int | None, Parameter(validator=validators.Number(gte=1))] = None,
+    shard: str | None = None,
+    timings: Path | None = None,
     workdir: Path = Path(),
 ) -> None:
     """Compile all shared slides (presentation only by default).
@@ -17,6 +23,11 @@ def check_all(
         handout: Produce PDFs without animations
         presentation: Produce PDFs with animations
         print: Produce printable PDFs
+        jobs: Maximum number of parallel compilations (defaults to the CPU count)
+        shard: Only compile the K-th of N groups of decks, formatted as K/N. The \
+            groups are balanced by compilation time if timings is given
+        timings: Timings file shared by all the shards to balance them. Written \
+            with the compilation times of all the decks when shard is not given
         workdir: Path to move into before running the command
 
     """
@@ -27,4 +38,7 @@ def check_all(
         build_handout=handout,
         build_presentation=presentation,
         build_print=print,
+        jobs=jobs,
+        shard=shard,
+        timings=timings,
     )
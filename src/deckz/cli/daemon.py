@@ -0,0 +1,14 @@
+from . import app
+
+
+@app.command()
+def daemon() -> None:
+    """Keep deckz warm and run the builds requested by other deckz commands.
+
+    While the daemon is running, the run command and the watch section, file and \
+    assets commands forward their builds to it instead of running them themselves, \
+    saving the startup costs. Stop it with Ctrl+C.
+    """
+    from ..daemon import Daemon, socket_path
+
+    Daemon(socket_path()).serve()
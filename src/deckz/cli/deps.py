@@ -41,7 +41,9 @@ def deps(
 
     settings = GlobalSettings.from_yaml(workdir)
     sections_analyzer = SectionsAnalyzer(
-        settings.paths.shared_latex_dir, settings.paths.git_dir
+        settings.paths.shared_latex_dir,
+        settings.paths.git_dir,
+        settings.paths.deck_index,
     )
 
     if unused:
@@ -68,7 +68,9 @@ def img_deps(
 
     with console.status("Finding unlicensed images"):
         images_analyzer = ImagesAnalyzer(
-            settings.paths.shared_dir, settings.paths.git_dir
+            settings.paths.shared_dir,
+            settings.paths.git_dir,
+            settings.paths.deck_index,
         )
         unlicensed_images = images_analyzer.sections_unlicensed_images()
         sorted_unlicensed_images = {
@@ -16,6 +16,8 @@ def run(
 ) -> None:
     """Compile the deck in WORKDIR.
 
+    The compilation is forwarded to the deckz daemon if it is running.
+
     Args:
         parts: Restrict deck compilation to these parts
         handout: Produce PDFs without animations
@@ -24,6 +26,18 @@ def run(
         workdir: Path to move into before running the command
 
     """
+    from ..daemon import forward
+
+    if forward(
+        "run",
+        workdir,
+        build_handout=handout,
+        build_presentation=presentation,
+        build_print=print,
+        parts_whitelist=parts,
+    ):
+        return
+
     from ..configuring.settings import DeckSettings
     from ..pipelines import run
 
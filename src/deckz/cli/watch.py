@@ -17,29 +17,46 @@ def deck(
     handout: bool = False,
     presentation: bool = True,
     print: bool = False,  # noqa: A002
-    minimum_delay: int = 5,
+    minimum_delay: float = 0.5,
     workdir: Path = Path(),
 ) -> None:
-    """Compile on change.
+    """Compile on change, only rebuilding the parts affected by the change.
 
     Args:
         parts: Restrict deck compilation to these parts
         handout: Produce PDFs without animations
         presentation: Produce PDFs with animations
         print: Produce printable PDFs
-        minimum_delay: Minimum number of seconds before recompiling
+        minimum_delay: Number of seconds without changes before recompiling
         workdir: Path to move into before running the command
 
     """
     from logging import getLogger
+    from threading import Event
 
     from ..configuring.settings import DeckSettings
+    from ..models import Deck
     from ..pipelines import run, watch
 
     logger = getLogger(__name__)
 
     logger.info("Watching the shared, current and user directories")
     settings = DeckSettings.from_yaml(workdir)
+    previous_deck: Deck | None = None
+
+    def build(changed_paths: frozenset[Path] | None, cancel_event: Event) -> None:
+        nonlocal previous_deck
+        previous_deck = run(
+            settings=settings,
+            build_handout=handout,
+            build_presentation=presentation,
+            build_print=print,
+            parts_whitelist=parts,
+            changed_paths=changed_paths,
+            cancel_event=cancel_event,
+            previous_deck=previous_deck,
+        )
+
     to_watch = [settings.paths.shared_dir, settings.paths.current_dir]
     if settings.paths.user_config_dir.exists():
         to_watch.append(settings.paths.user_config_dir)
@@ -49,16 +66,13 @@ def deck(
         frozenset(
             [
                 settings.paths.shared_tikz_pdf_dir,
+                settings.paths.shared_plt_pdf_dir,
+                settings.paths.shared_plotly_pdf_dir,
                 settings.paths.pdf_dir,
                 settings.paths.build_dir,
             ]
         ),
-        run,
-        settings=settings,
-        build_handout=handout,
-        build_presentation=presentation,
-        build_print=print,
-        parts_whitelist=parts,
+        build,
     )
 
 
@@ -71,28 +85,32 @@ def section(
     handout: bool = False,
     presentation: bool = True,
     print: bool = False,  # noqa: A002
-    minimum_delay: int = 5,
+    minimum_delay: float = 0.5,
     workdir: Path = Path(),
 ) -> None:
     """Compile a specific FLAVOR of a given SECTION on change.
 
+    The compilations are forwarded to the deckz daemon if it is running.
+
     Args:
         section: Section to compile
         flavor: Flavor of SECTION to compile
         handout: Produce PDFs without animations
         presentation: Produce PDFs with animations
         print: Produce printable PDFs
-        minimum_delay: Minimum number of seconds before recompiling
+        minimum_delay: Number of seconds without changes before recompiling
         workdir: Path to move into before running the command
 
     """
     from logging import getLogger
     from tempfile import TemporaryDirectory
+    from threading import Event
 
     from typer import launch
 
     from .. import app_name
     from ..configuring.settings import DeckSettings
+    from ..daemon import forward
     from ..pipelines import run_section, watch
 
     logger = getLogger(__name__)
@@ -112,6 +130,29 @@ def section(
 
         launch(str(pdf_dir))
 
+        def build(_: frozenset[Path] | None, cancel_event: Event) -> None:
+            if forward(
+                "run_section",
+                workdir,
+                cancel_event=cancel_event,
+                paths={"build_dir": Path(build_dir), "pdf_dir": Path(pdf_dir)},
+                section=section,
+                flavor=flavor,
+                build_handout=handout,
+                build_presentation=presentation,
+                build_print=print,
+            ):
+                return
+            run_section(
+                section=section,
+                flavor=flavor,
+                settings=settings,
+                build_handout=handout,
+                build_presentation=presentation,
+                build_print=print,
+                cancel_event=cancel_event,
+            )
+
         to_watch = [settings.paths.shared_dir, settings.paths.current_dir]
         if settings.paths.user_config_dir.exists():
             to_watch.append(settings.paths.user_config_dir)
@@ -121,17 +162,13 @@ def section(
             frozenset(
                 [
                     settings.paths.shared_tikz_pdf_dir,
+                    settings.paths.shared_plt_pdf_dir,
+                    settings.paths.shared_plotly_pdf_dir,
                     settings.paths.pdf_dir,
                     settings.paths.build_dir,
                 ]
             ),
-            run_section,
-            section=section,
-            flavor=flavor,
-            settings=settings,
-            build_handout=handout,
-            build_presentation=presentation,
-            build_print=print,
+            build,
         )
 
 
@@ -143,28 +180,32 @@ def file(
     handout: bool = False,
     presentation: bool = True,
     print: bool = False,  # noqa: A002
-    minimum_delay: int = 5,
+    minimum_delay: float = 0.5,
     workdir: Path = Path(),
 ) -> None:
     """Compile a file on change.
 
+    The compilations are forwarded to the deckz daemon if it is running.
+
     Args:
         latex: File to compile on change. Its path should be specified relative to \
             shared/latex
         handout: Produce PDFs without animations
         presentation: Produce PDFs with animations
         print: Produce printable PDFs
-        minimum_delay: Minimum number of seconds before recompiling
+        minimum_delay: Number of seconds without changes before recompiling
         workdir: Path to move into before running the command
 
     """
     from logging import getLogger
     from tempfile import TemporaryDirectory
+    from threading import Event
 
     from typer import launch
 
     from .. import app_name
     from ..configuring.settings import DeckSettings
+    from ..daemon import forward
     from ..pipelines import run_file, watch
 
     logger = getLogger(__name__)
@@ -182,6 +223,28 @@ def file(
         settings.paths.build_dir = Path(build_dir)
         settings.paths.pdf_dir = Path(pdf_dir)
         launch(str(pdf_dir))
+
+        def build(_: frozenset[Path] | None, cancel_event: Event) -> None:
+            if forward(
+                "run_file",
+                workdir,
+                cancel_event=cancel_event,
+                paths={"build_dir": Path(build_dir), "pdf_dir": Path(pdf_dir)},
+                latex=latex,
+                build_handout=handout,
+                build_presentation=presentation,
+                build_print=print,
+            ):
+                return
+            run_file(
+                latex=latex,
+                settings=settings,
+                build_handout=handout,
+                build_presentation=presentation,
+                build_print=print,
+                cancel_event=cancel_event,
+            )
+
         to_watch = [settings.paths.shared_dir]
         if settings.paths.user_config_dir.exists():
             to_watch.append(settings.paths.user_config_dir)
@@ -191,33 +254,37 @@ def file(
             frozenset(
                 [
                     settings.paths.shared_tikz_pdf_dir,
+                    settings.paths.shared_plt_pdf_dir,
+                    settings.paths.shared_plotly_pdf_dir,
                     settings.paths.pdf_dir,
                     settings.paths.build_dir,
                 ]
             ),
-            run_file,
-            latex=latex,
-            settings=settings,
-            build_handout=handout,
-            build_presentation=presentation,
-            build_print=print,
+            build,
         )
 
 
 @watch.command()
-def assets(*, minimum_delay: int = 5, workdir: Path = Path()) -> None:
+def assets(*, minimum_delay: float = 0.5, workdir: Path = Path()) -> None:
     """Compile assets on change.
 
+    The compilations are forwarded to the deckz daemon if it is running.
+
     Args:
-        minimum_delay: Minimum number of seconds before recompiling
+        minimum_delay: Number of seconds without changes before recompiling
         workdir: Path to move into before running the command
 
     """
     from ..configuring.settings import GlobalSettings
+    from ..daemon import forward
     from ..pipelines import run_assets, watch
 
     settings = GlobalSettings.from_yaml(workdir)
 
+    def build(*_: object) -> None:
+        if not forward("run_assets", workdir):
+            run_assets(workdir)
+
     watch(
         minimum_delay,
         frozenset(
@@ -234,6 +301,5 @@ def assets(*, minimum_delay: int = 5, workdir: Path = Path()) -> None:
                 settings.paths.shared_plotly_pdf_dir,
             ]
         ),
-        run_assets,
-        workdir,
+        build,
     )
@@ -1,11 +1,15 @@
 from abc import abstractmethod
+from collections.abc import Callable, Set
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from ..configuring.registry import DeckComponent, GlobalComponent
 
 if TYPE_CHECKING:
-    from ..models import AssetsUsage, CompileResult, Deck, FlavorName
+    from multiprocessing.pool import Pool
+    from threading import Event
+
+    from ..models import AssetsUsage, CompileResult, Deck, FlavorName, PartName
 
 
 class Parser(DeckComponent, key="parser"):
@@ -32,6 +36,29 @@ class Parser(DeckComponent, key="parser"):
     def from_section(self, section: str, flavor: "FlavorName") -> "Deck":
         raise NotImplementedError
 
+    def reparse(
+        self, deck: "Deck", deck_definition_path: Path, changed_paths: Set[Path]
+    ) -> tuple["Deck", set["PartName"]]:
+        """Parse a deck again after some of its sources changed.
+
+        The default implementation parses the whole deck again and compares its \
+        parts to the previous ones.
+
+        Args:
+            deck: Previous version of the deck.
+            deck_definition_path: Path to the yaml definition of the deck.
+            changed_paths: Paths that changed since the previous version was parsed.
+
+        Returns:
+            The parsed deck and the names of the parts that changed.
+        """
+        new_deck = self.from_deck_definition(deck_definition_path)
+        return new_deck, {
+            name
+            for name, part in new_deck.parts.items()
+            if deck.parts.get(name) != part
+        }
+
     @abstractmethod
     def from_file(self, latex: str) -> "Deck":
         raise NotImplementedError
@@ -45,29 +72,54 @@ class Builder(DeckComponent, key="builder"):
         build_presentation: bool,
         build_handout: bool,
         build_print: bool,
+        parts_to_rebuild: "Set[PartName] | None" = None,
     ):
         self._variables = variables
         self._deck = deck
         self._build_presentation = build_presentation
         self._build_handout = build_handout
         self._build_print = build_print
+        self._parts_to_rebuild = parts_to_rebuild
 
     @abstractmethod
-    def build(self) -> bool:
+    def build(
+        self, cancel_event: "Event | None" = None, pool: "Pool | None" = None
+    ) -> bool:
         raise NotImplementedError
 
 
 class AssetsBuilder(GlobalComponent, key="assets_builder"):
     @abstractmethod
-    def build(self) -> None:
+    def build(self, pool: "Pool | None" = None) -> None:
         raise NotImplementedError
 
+    def submit(self, pool: "Pool") -> Callable[[], None]:
+        """Start building the assets in a pool of workers, without waiting for them.
+
+        Builders overriding this method let the default assets builder schedule their \
+        work together with the work of the other builders. By default, the assets are \
+        built before returning.
+
+        Args:
+            pool: Pool of workers to build the assets in.
+
+        Returns:
+            Function waiting for the assets to be built.
+        """
+        self.build(pool)
+        return lambda: None
+
 
 class Compiler(GlobalComponent, key="compiler"):
     @abstractmethod
     def compile(self, file: Path) -> "CompileResult":
         raise NotImplementedError
 
+    @property
+    def fingerprint(self) -> str:
+        """Identify the compilation settings, to invalidate cached outputs on change."""
+        return type(self).__qualname__
+
 
 class Renderer(GlobalComponent, key="renderer"):
     @abstractmethod
@@ -76,23 +128,52 @@ class Renderer(GlobalComponent, key="renderer"):
     ) -> tuple[str, "AssetsUsage"]:
         raise NotImplementedError
 
+    def included_templates(self, template_path: Path) -> set[Path]:
+        """List the templates a template includes, imports or extends, recursively.
+
+        Args:
+            template_path: Path of the template.
+
+        Returns:
+            Paths of the templates used to render the template, itself excluded.
+        """
+        return set()
+
+    def used_variables(self, template_path: Path) -> set[str] | None:
+        """List the variables a template and the templates it includes read.
+
+        Args:
+            template_path: Path of the template.
+
+        Returns:
+            Names of the variables read by the template, None if they are unknown.
+        """
+        return None
+
     def render_to_path(
         self, template_path: Path, output_path: Path, /, **template_kwargs: Any
     ) -> "AssetsUsage":
         from contextlib import suppress
         from filecmp import cmp
-        from shutil import move
         from tempfile import NamedTemporaryFile
 
         try:
-            with NamedTemporaryFile("w", encoding="utf8", delete=False) as fh:
+            # Written next to the output so that the replacement is atomic
+            with NamedTemporaryFile(
+                "w",
+                encoding="utf8",
+                dir=output_path.parent,
+                prefix=f".{output_path.name}.",
+                suffix=".tmp",
+                delete=False,
+            ) as fh:
                 rendered, assets_usage = self.render_to_str(
                     template_path, **template_kwargs
                 )
                 fh.write(rendered)
                 fh.write("\n")
             if not output_path.exists() or not cmp(fh.name, str(output_path)):
-                move(fh.name, output_path)
+                Path(fh.name).replace(output_path)
         finally:
             with suppress(FileNotFoundError):
                 Path(fh.name).unlink()
@@ -1,21 +1,31 @@
 import sys
-from collections.abc import Callable
-from contextlib import redirect_stdout
+from collections.abc import Callable, Iterable, Sequence
+from contextlib import ExitStack, redirect_stdout
 from dataclasses import dataclass
+from hashlib import sha256
 from itertools import chain
+from json import JSONDecodeError, dumps, loads
 from logging import getLogger
 from multiprocessing import Pool
+from multiprocessing.pool import Pool as PoolType
+from os import getpid
 from pathlib import Path
+from re import compile as re_compile
 from shutil import copyfile
 from tempfile import TemporaryDirectory
+from time import perf_counter
+from traceback import format_exc
+from typing import Any, cast
 from plotly.graph_objs import Figure
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ByteSize, ConfigDict
 
+from ..assets_caching import AssetsCache
 from ..configuring.settings import PathFromSettings
 from ..exceptions import DeckzError
-from ..utils import copy_file_if_newer, import_module_and_submodules
+from ..utils import copy_file_if_newer, hash_file, import_module_and_submodules
 from . import AssetsBuilder, Compiler
+from .compiling import CompileResult
 
 
 @dataclass(frozen=True)
@@ -27,6 +37,199 @@ class CompilePaths:
     output_log: Path
 
 
+_MANIFEST_NAME = "manifest.json"
+
+
+class _Manifest:
+    """Digests of the inputs of the assets produced in an output directory.
+
+    An asset is stale when the digest of its inputs differs from the one recorded \
+    when it was produced. Contrary to modification times, the digests survive a \
+    checkout or a fresh clone, so the manifest is meant to be versioned along with \
+    the assets.
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self._output_dir = output_dir
+        self._path = output_dir / _MANIFEST_NAME
+        try:
+            self._digests: dict[str, str] = loads(self._path.read_text(encoding="utf8"))
+        except (FileNotFoundError, JSONDecodeError):
+            self._digests = {}
+        self._changed = False
+
+    def is_fresh(self, output_path: Path, digest: str) -> bool:
+        return (
+            output_path.exists() and self._digests.get(self._key(output_path)) == digest
+        )
+
+    def record(self, output_path: Path, digest: str) -> None:
+        key = self._key(output_path)
+        if self._digests.get(key) != digest:
+            self._digests[key] = digest
+            self._changed = True
+
+    def save(self) -> None:
+        # Rewriting an unchanged manifest would trigger the watchers of the assets
+        if not self._changed:
+            return
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(f"{self._path.name}.{getpid()}.tmp")
+        tmp_path.write_text(
+            f"{dumps(self._digests, indent=2, sort_keys=True)}\n", encoding="utf8"
+        )
+        tmp_path.replace(self._path)
+        self._changed = False
+
+    def _key(self, output_path: Path) -> str:
+        return output_path.relative_to(self._output_dir).as_posix()
+
+
+def _restore_cached(
+    cache: AssetsCache | None,
+    manifest: _Manifest,
+    stale: Iterable[tuple[Path, str]],
+) -> set[Path]:
+    """Copy the stale assets found in the cache, recording them in the manifest.
+
+    Args:
+        cache: Cache to copy the assets from. Nothing is restored if None.
+        manifest: Manifest of the output directory of the assets.
+        stale: Output path and digest of the inputs of each stale asset.
+
+    Returns:
+        Output paths of the restored assets.
+    """
+    if cache is None:
+        return set()
+    restored = set()
+    for output_path, digest in stale:
+        if cache.restore(digest, output_path):
+            manifest.record(output_path, digest)
+            restored.add(output_path)
+    if restored:
+        getLogger(__name__).info(f"Restored {len(restored)} asset(s) from the cache")
+    return restored
+
+
+def _save(manifest: _Manifest, cache: AssetsCache | None) -> None:
+    manifest.save()
+    if cache is not None:
+        cache.evict()
+
+
+def _digest(command: str, files: Iterable[tuple[str, Path]]) -> str:
+    """Hash the command producing an asset and the content of its input files.
+
+    Args:
+        command: Description of how the asset is produced.
+        files: Input files of the asset, with names independent of the location of \
+            the repository.
+
+    Returns:
+        Hexadecimal digest of the inputs of the asset.
+    """
+    hasher = sha256()
+    hasher.update(f"{command}\n".encode())
+    for name, path in sorted(files):
+        hasher.update(f"{name}:{hash_file(path)}\n".encode())
+    return hasher.hexdigest()
+
+
+def _python_dependencies(module_name: str) -> list[tuple[str, Path]]:
+    """List the files of a module and of the modules it imports, directly or not.
+
+    Only the modules of the same top-level package are listed: the third-party and \
+    standard modules are not expected to change between builds. The modules must \
+    already be imported.
+
+    Args:
+        module_name: Fully qualified name of the module.
+
+    Returns:
+        Files of the modules, with their names relative to the top-level package.
+    """
+    from ast import Import, ImportFrom, parse, walk
+    from importlib.util import resolve_name
+
+    package = module_name.partition(".")[0]
+    to_visit = [module_name]
+    dependencies = {}
+    while to_visit:
+        name = to_visit.pop()
+        module = sys.modules.get(name)
+        if (
+            name in dependencies
+            or name.partition(".")[0] != package
+            or module is None
+            or module.__file__ is None
+        ):
+            continue
+        path = Path(module.__file__)
+        dependencies[name] = path
+        for node in walk(parse(path.read_bytes(), filename=str(path))):
+            if isinstance(node, Import):
+                to_visit.extend(alias.name for alias in node.names)
+            elif isinstance(node, ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    base = resolve_name("." * node.level + base, module.__package__)
+                to_visit.append(base)
+                to_visit.extend(f"{base}.{alias.name}" for alias in node.names)
+    return list(dependencies.items())
+
+
+_LATEX_REFERENCE = re_compile(
+    r"\\(?:input|include|includegraphics|usepackage)\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}"
+)
+_LATEX_REFERENCE_SUFFIXES = ("", ".tex", ".sty", ".pdf", ".png", ".jpg", ".jpeg")
+
+
+def _latex_dependencies(
+    latex_path: Path, search_dirs: Iterable[Path]
+) -> list[tuple[str, Path]]:
+    """List the files referenced by a LaTeX file, directly or not.
+
+    Only the references found in the search directories are listed: the packages \
+    of the LaTeX distribution are not expected to change between builds.
+
+    Args:
+        latex_path: Path of the LaTeX file.
+        search_dirs: Directories in which the references are searched.
+
+    Returns:
+        Referenced files, with their names as referenced.
+    """
+    search_dirs = list(search_dirs)
+    to_visit = [latex_path]
+    dependencies: dict[str, Path] = {}
+    while to_visit:
+        content = to_visit.pop().read_text(encoding="utf8", errors="replace")
+        for match in _LATEX_REFERENCE.finditer(content):
+            for reference in match.group(1).split(","):
+                found = _find_latex_reference(reference.strip(), search_dirs)
+                if found is None or found[0] in dependencies:
+                    continue
+                name, path = found
+                dependencies[name] = path
+                if path.suffix in (".tex", ".sty"):
+                    to_visit.append(path)
+    return list(dependencies.items())
+
+
+def _find_latex_reference(
+    reference: str, search_dirs: Iterable[Path]
+) -> tuple[str, Path] | None:
+    if not reference:
+        return None
+    for search_dir in search_dirs:
+        for suffix in _LATEX_REFERENCE_SUFFIXES:
+            path = search_dir / f"{reference}{suffix}"
+            if path.is_file():
+                return f"{reference}{suffix}", path
+    return None
+
+
 class _DefaultAssetsBuilderExtraKwArgs(BaseModel):
     assets_builder_keys: tuple[str, ...] = ("plt", "tikz", "plotly")
 
@@ -37,9 +240,56 @@ class DefaultAssetsBuilder(
     def __init__(self, assets_builder_keys: tuple[str, ...]):
         self._builders = [self.new_dep(AssetsBuilder, k) for k in assets_builder_keys]
 
-    def build(self) -> None:
-        for assets_builder in self._builders:
-            assets_builder.build()
+    def build(self, pool: PoolType | None = None) -> None:
+        _build_in_pool(self, pool)
+
+    def submit(self, pool: PoolType) -> Callable[[], None]:
+        # Every builder submits its work before any is waited for, so that the
+        # compilations of tikz figures overlap with the rendering of plots
+        finishers = [assets_builder.submit(pool) for assets_builder in self._builders]
+
+        def finish() -> None:
+            errors = []
+            for finisher in finishers:
+                try:
+                    finisher()
+                except DeckzError as e:
+                    errors.append(str(e))
+            if errors:
+                msg = "\n".join(errors)
+                raise DeckzError(msg)
+
+        return finish
+
+
+def _build_in_pool(assets_builder: AssetsBuilder, pool: PoolType | None) -> None:
+    if pool is not None:
+        assets_builder.submit(pool)()
+        return
+    with _LazyPool() as new_pool:
+        assets_builder.submit(cast("PoolType", new_pool))()
+
+
+class _LazyPool:
+    """Pool of workers started when work is first sent to it.
+
+    Most builds find every asset up to date: they do not pay for starting workers.
+    """
+
+    def __init__(self) -> None:
+        self._pool: PoolType | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._pool is None:
+            self._pool = Pool()
+        return getattr(self._pool, name)
+
+    def __enter__(self) -> "_LazyPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
 
 
 _plt_registry: list[tuple[Path, Path, Callable[[], None]]] = []
@@ -87,20 +337,177 @@ def register_plotly(
     return worker
 
 
+def _submit_plots(
+    build_pdf: Callable[[str, str, str, Path], str | None],
+    items: Sequence[tuple[Path, Path, Callable[[], Any], str]],
+    manifest: _Manifest,
+    cache: AssetsCache | None,
+    pool: PoolType,
+) -> Callable[[], None]:
+    """Start building plots in a pool of processes.
+
+    Args:
+        build_pdf: Function building a plot in a worker, from the module and the \
+            name of the plot function, the version of its package and the output \
+            path. Returns the formatted exception if the plot could not be built, \
+            None otherwise.
+        items: Output path, Python path, plot function and digest of the inputs of \
+            each plot to build.
+        manifest: Manifest of the output directory of the plots.
+        cache: Cache to store the built plots in. Nothing is stored if None.
+        pool: Pool of workers to build the plots in.
+
+    Returns:
+        Function waiting for the plots, recording them and collecting the failures.
+    """
+    versions = {f.__module__: _package_version(f.__module__) for _, _, f, _ in items}
+    async_errors = pool.starmap_async(
+        build_pdf,
+        ((f.__module__, f.__name__, versions[f.__module__], o) for o, _, f, _ in items),
+    )
+
+    def finish() -> None:
+        _keep_plots(items, async_errors.get(), manifest, cache)
+
+    return finish
+
+
+def _keep_plots(
+    items: Sequence[tuple[Path, Path, Callable[[], Any], str]],
+    errors: Sequence[str | None],
+    manifest: _Manifest,
+    cache: AssetsCache | None,
+) -> None:
+    """Record the successfully built plots and report the others.
+
+    Args:
+        items: Output path, Python path, plot function and digest of the inputs of \
+            each plot built.
+        errors: Formatted exception of each plot, None if it was built.
+        manifest: Manifest of the output directory of the plots.
+        cache: Cache to store the built plots in. Nothing is stored if None.
+
+    Raises:
+        DeckzError: Raised if some plots could not be built.
+    """
+    logger = getLogger(__name__)
+    failed = []
+    for (output_path, python_path, function, digest), error in zip(
+        items, errors, strict=True
+    ):
+        if error is None:
+            manifest.record(output_path, digest)
+            if cache is not None:
+                cache.store(digest, output_path)
+        else:
+            failed.append((python_path, function))
+            logger.warning("Plot %s errored", function.__qualname__)
+            logger.warning("Captured exception\n%s", error)
+    _save(manifest, cache)
+    if failed:
+        formatted_fails = "\n".join(
+            f"- {function.__qualname__} ({python_path})"
+            for python_path, function in failed
+        )
+        msg = (
+            f"plot generation errored for {len(failed)} plots:\n"
+            f"{formatted_fails}\n"
+            "Please also check the errors above."
+        )
+        raise DeckzError(msg)
+
+
+_imported_versions: dict[str, str] = {}
+"""Version of the plots packages imported by the current worker."""
+
+
+def _package_version(module_name: str) -> str:
+    package = module_name.partition(".")[0]
+    return _digest(
+        package,
+        (
+            (name, Path(module.__file__))
+            for name, module in list(sys.modules.items())
+            if name.partition(".")[0] == package and module.__file__ is not None
+        ),
+    )
+
+
+def _import_plot_function(
+    module_name: str, function_name: str, version: str
+) -> Callable[[], Any]:
+    # Workers can outlive a build (see the daemon): they import the plots package
+    # once, and again from scratch when it changed, as reloading its modules one by
+    # one could bind them to outdated versions of each other
+    package = module_name.partition(".")[0]
+    if _imported_versions.get(package) != version:
+        sys.dont_write_bytecode = True
+        _clear_register()
+        for name in [n for n in sys.modules if n.partition(".")[0] == package]:
+            del sys.modules[name]
+        import_module_and_submodules(package)
+        _imported_versions[package] = version
+    return getattr(sys.modules[module_name], function_name)
+
+
+def _build_plt_pdf(
+    module_name: str, function_name: str, version: str, output_path: Path
+) -> str | None:
+    import matplotlib
+
+    matplotlib.use("PDF")
+
+    import matplotlib.pyplot as plt
+
+    try:
+        function = _import_plot_function(module_name, function_name, version)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Settings changed by a plot should not leak to the next plots of the worker
+        with matplotlib.rc_context():
+            function()
+            plt.savefig(output_path, bbox_inches="tight")
+    except Exception:
+        return format_exc()
+    finally:
+        plt.close("all")
+    return None
+
+
+def _build_plotly_pdf(
+    module_name: str, function_name: str, version: str, output_path: Path
+) -> str | None:
+    try:
+        function = _import_plot_function(module_name, function_name, version)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        function().write_image(output_path)
+    except Exception:
+        return format_exc()
+    return None
+
+
 class _PltAssetsBuilderExtraKwArgs(BaseModel):
     model_config = ConfigDict(validate_default=True)
 
     output_dir: PathFromSettings = "paths.shared_plt_pdf_dir"  # type: ignore[assignment]
+    cache_dir: PathFromSettings = "paths.assets_cache_dir"  # type: ignore[assignment]
+    use_cache: bool = True
+    cache_max_size: ByteSize = "1GiB"  # type: ignore[assignment]
 
 
 class PltAssetsBuilder(
     AssetsBuilder, key="plt", extra_kwargs_class=_PltAssetsBuilderExtraKwArgs
 ):
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self, output_dir: Path, cache_dir: Path, use_cache: bool, cache_max_size: int
+    ):
         self._output_dir = output_dir
+        self._cache = AssetsCache(cache_dir, cache_max_size) if use_cache else None
         self._logger = getLogger(__name__)
 
-    def build(self) -> None:
+    def build(self, pool: PoolType | None = None) -> None:
+        _build_in_pool(self, pool)
+
+    def submit(self, pool: PoolType) -> Callable[[], None]:
         import matplotlib
 
         matplotlib.use("PDF")
@@ -111,50 +518,80 @@ class PltAssetsBuilder(
             import_module_and_submodules("plots")
         except ModuleNotFoundError:
             self._logger.warning("Could not find plots module, will not produce plots.")
-        full_items = [(self._output_dir / o, p, f) for o, p, f in _plt_registry]
-        to_build = [(o, p, f) for o, p, f in full_items if self._needs_compile(p, o)]
+        manifest = _Manifest(self._output_dir)
+        full_items = [
+            (self._output_dir / o, p, f, self._digest(f)) for o, p, f in _plt_registry
+        ]
+        to_build = [
+            (o, p, f, d) for o, p, f, d in full_items if not manifest.is_fresh(o, d)
+        ]
+        restored = _restore_cached(
+            self._cache, manifest, ((o, d) for o, _, _, d in to_build)
+        )
+        to_build = [(o, p, f, d) for o, p, f, d in to_build if o not in restored]
+        if restored:
+            manifest.save()
 
         if not to_build:
-            return
+            return lambda: None
 
         self._logger.info(f"Processing {len(to_build)} plot(s) that need recompiling")
 
-        for output_path, python_path, function in to_build:
-            self._build_pdf(python_path, output_path, function)
+        return _submit_plots(_build_plt_pdf, to_build, manifest, self._cache, pool)
 
-    def _build_pdf(
-        self, python_path: Path, output_path: Path, function: Callable[[], None]
-    ) -> None:
-        import matplotlib.pyplot as plt
+    def _digest(self, function: Callable[[], None]) -> str:
+        import matplotlib
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        function()
+        return _digest(
+            f"matplotlib {matplotlib.__version__} {function.__qualname__}",
+            _python_dependencies(function.__module__),
+        )
 
-        plt.savefig(output_path, bbox_inches="tight")
-        plt.close()
 
-    def _needs_compile(self, python_path: Path, output_path: Path) -> bool:
-        return (
-            not output_path.exists()
-            or output_path.stat().st_mtime_ns < python_path.stat().st_mtime_ns
-        )
+def _build_plotly_figure(
+    module_name: str, function_name: str, version: str
+) -> tuple[dict[str, Any] | None, str | None, float]:
+    start = perf_counter()
+    try:
+        function = _import_plot_function(module_name, function_name, version)
+        # Sent as JSON to the browser exporting it
+        figure = loads(function().to_json())
+    except Exception:
+        return None, format_exc(), perf_counter() - start
+    return figure, None, perf_counter() - start
 
 
 class _PlotlyAssetsBuilderExtraKwArgs(BaseModel):
     model_config = ConfigDict(validate_default=True)
 
     output_dir: PathFromSettings = "paths.shared_plotly_pdf_dir"  # type: ignore[assignment]
+    cache_dir: PathFromSettings = "paths.assets_cache_dir"  # type: ignore[assignment]
+    use_cache: bool = True
+    cache_max_size: ByteSize = "1GiB"  # type: ignore[assignment]
+    batch_export: bool = False
 
 
 class PlotlyAssetsBuilder(
     AssetsBuilder, key="plotly", extra_kwargs_class=_PlotlyAssetsBuilderExtraKwArgs
     ):
 
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        cache_dir: Path,
+        use_cache: bool,
+        cache_max_size: int,
+        batch_export: bool,
+    ):
         self._output_dir = output_dir
+        self._cache = AssetsCache(cache_dir, cache_max_size) if use_cache else None
+        self._batch_export = batch_export
         self._logger = getLogger(__name__)
 
-    def build(self) -> None:
+    def build(self, pool: PoolType | None = None) -> None:
+        _build_in_pool(self, pool)
+
+    def submit(self, pool: PoolType) -> Callable[[], None]:
         sys.dont_write_bytecode = True
         _clear_register()
         try:
@@ -163,30 +600,111 @@ class PlotlyAssetsBuilder(
             self._logger.warning(
                 "Could not find pltly module, will not produce plotly plots."
                 )
-        full_items = [(self._output_dir / o, p, f) for o, p, f in _plotly_registry]
-        to_build = [(o, p, f) for o, p, f in full_items if self._needs_compile(p, o)]
+        manifest = _Manifest(self._output_dir)
+        full_items = [
+            (self._output_dir / o, p, f, self._digest(f))
+            for o, p, f in _plotly_registry
+        ]
+        to_build = [
+            (o, p, f, d) for o, p, f, d in full_items if not manifest.is_fresh(o, d)
+        ]
+        restored = _restore_cached(
+            self._cache, manifest, ((o, d) for o, _, _, d in to_build)
+        )
+        to_build = [(o, p, f, d) for o, p, f, d in to_build if o not in restored]
+        if restored:
+            manifest.save()
 
         if not to_build:
-            return
+            return lambda: None
 
         self._logger.info(
             f"Processing {len(to_build)} plot(s) that need recompiling"
             )
 
-        for output_path, python_path, function in to_build:
-            self._build_pdf(python_path, output_path, function)
+        if self._batch_export:
+            return self._submit_build_and_export(to_build, manifest, pool)
+        return _submit_plots(_build_plotly_pdf, to_build, manifest, self._cache, pool)
+
+    def _submit_build_and_export(
+        self,
+        items: Sequence[tuple[Path, Path, Callable[[], Figure], str]],
+        manifest: _Manifest,
+        pool: PoolType,
+    ) -> Callable[[], None]:
+        # Figures are built in parallel, then exported together by a single browser
+        version = _package_version("pltly")
+        async_figures = pool.starmap_async(
+            _build_plotly_figure,
+            ((f.__module__, f.__name__, version) for _, _, f, _ in items),
+        )
+        return lambda: self._export(items, async_figures.get(), manifest)
 
-    def _build_pdf(
-        self, python_path: Path, output_path: Path, function: Callable[[], Figure]
+    def _export(
+        self,
+        items: Sequence[tuple[Path, Path, Callable[[], Figure], str]],
+        figures: Sequence[tuple[dict[str, Any] | None, str | None, float]],
+        manifest: _Manifest,
     ) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        fig = function()
-        fig.write_image(output_path)
+        import plotly.io
+
+        errors = [error for _, error, _ in figures]
+        for (output_path, _, _, _), (_, _, duration) in zip(
+            items, figures, strict=True
+        ):
+            self._logger.debug("Built the figure of %s in %.2fs", output_path, duration)
+        to_export = [
+            (output_path, figure)
+            for (output_path, _, _, _), (figure, _, _) in zip(
+                items, figures, strict=True
+            )
+            if figure is not None
+        ]
+        for output_path, _ in to_export:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+        start = perf_counter()
+        try:
+            plotly.io.write_images(
+                [figure for _, figure in to_export],
+                [output_path for output_path, _ in to_export],
+                format="pdf",
+            )
+        except Exception:
+            self._logger.warning(
+                "Could not export the plots in a batch, exporting them one by one\n%s",
+                format_exc(),
+            )
+            self._export_one_by_one(items, figures, errors)
+        else:
+            self._logger.debug(
+                "Exported %d plot(s) in %.2fs", len(to_export), perf_counter() - start
+            )
+        _keep_plots(items, errors, manifest, self._cache)
 
-    def _needs_compile(self, python_path: Path, output_path: Path) -> bool:
-        return (
-            not output_path.exists()
-            or output_path.stat().st_mtime_ns < python_path.stat().st_mtime_ns
+    def _export_one_by_one(
+        self,
+        items: Sequence[tuple[Path, Path, Callable[[], Figure], str]],
+        figures: Sequence[tuple[dict[str, Any] | None, str | None, float]],
+        errors: list[str | None],
+    ) -> None:
+        import plotly.io
+
+        for i, ((output_path, _, _, _), (figure, _, _)) in enumerate(
+            zip(items, figures, strict=True)
+        ):
+            if figure is None:
+                continue
+            try:
+                plotly.io.write_image(figure, output_path, format="pdf")
+            except Exception:
+                errors[i] = format_exc()
+
+    def _digest(self, function: Callable[[], Figure]) -> str:
+        import plotly
+
+        return _digest(
+            f"plotly {plotly.__version__} {function.__qualname__}",
+            _python_dependencies(function.__module__),
         )
 
 
@@ -197,6 +715,9 @@ class _TikzAssetsBuilderExtraKwArgs(BaseModel):
     output_dir: PathFromSettings = "paths.shared_tikz_pdf_dir"  # type: ignore[assignment]
     assets_dir: PathFromSettings = "paths.shared_dir"  # type: ignore[assignment]
     compiler_key: str = "default"
+    cache_dir: PathFromSettings = "paths.assets_cache_dir"  # type: ignore[assignment]
+    use_cache: bool = True
+    cache_max_size: ByteSize = "1GiB"  # type: ignore[assignment]
 
 
 class TikzAssetsBuilder(
@@ -208,50 +729,59 @@ class TikzAssetsBuilder(
         output_dir: Path,
         assets_dir: Path,
         compiler_key: str,
+        cache_dir: Path,
+        use_cache: bool,
+        cache_max_size: int,
     ):
         self._input_dir = input_dir
         self._output_dir = output_dir
         self._assets_dir = assets_dir
         self._compiler = self.new_dep(Compiler, compiler_key)
+        self._cache = AssetsCache(cache_dir, cache_max_size) if use_cache else None
         self._logger = getLogger(__name__)
 
-    def build(self) -> None:
-        with TemporaryDirectory() as build_dir:
-            build_path = Path(build_dir)
-            items = [
-                (input_path, paths)
-                for input_path in chain(
-                    self._input_dir.rglob("*.py"),
-                    self._input_dir.rglob("*.tex"),
-                )
-                if self._needs_compile(
-                    input_path,
-                    paths := self._compute_compile_paths(input_path, build_path),
-                )
-            ]
+    def build(self, pool: PoolType | None = None) -> None:
+        _build_in_pool(self, pool)
+
+    def submit(self, pool: PoolType) -> Callable[[], None]:
+        manifest = _Manifest(self._output_dir)
+        with ExitStack() as stack:
+            build_path = Path(stack.enter_context(TemporaryDirectory()))
+            items, digests = self._list_items_to_compile(manifest, build_path)
 
             if not items:
-                return
+                return lambda: None
 
             self._logger.info(f"Processing {len(items)} tikz(s) that need recompiling")
 
             for item in items:
                 self._prepare(*item)
 
-            with Pool() as pool:
-                results = pool.map(
-                    self._compiler.compile, (item_path.latex for _, item_path in items)
-                )
-
-            for (_, paths), result in zip(items, results, strict=True):
-                if result.ok:
-                    paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
-                    copyfile(paths.build_pdf, paths.output_pdf)
-                    paths.output_log.unlink(missing_ok=True)
-                elif paths.build_log.exists():
-                    paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
-                    copyfile(paths.build_log, paths.output_log)
-
+            async_results = pool.map_async(
+                self._compiler.compile, (item_path.latex for _, item_path in items)
+            )
+            # The build directory is removed once the compilations are collected
+            build_dir_cleanup = stack.pop_all()
+
+        def finish() -> None:
+            with build_dir_cleanup:
+                results = async_results.get()
+                for (input_path, paths), result in zip(items, results, strict=True):
+                    if result.ok:
+                        self._keep_output(paths, digests[input_path], manifest)
+                    elif paths.build_log.exists():
+                        paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
+                        copyfile(paths.build_log, paths.output_log)
+                _save(manifest, self._cache)
+            self._report_failures(items, results)
+
+        return finish
+
+    def _report_failures(
+        self,
+        items: Sequence[tuple[Path, CompilePaths]],
+        results: Sequence[CompileResult],
+    ) -> None:
         failed = []
         for (input_path, paths), result in zip(items, results, strict=True):
             if not result.ok:
@@ -277,11 +807,52 @@ class TikzAssetsBuilder(
             )
             raise DeckzError(msg)
 
-    def _needs_compile(self, input_file: Path, compile_paths: CompilePaths) -> bool:
-        return (
-            not compile_paths.output_pdf.exists()
-            or compile_paths.output_pdf.stat().st_mtime < input_file.stat().st_mtime
+    def _keep_output(
+        self, paths: CompilePaths, digest: str, manifest: _Manifest
+    ) -> None:
+        paths.output_pdf.parent.mkdir(parents=True, exist_ok=True)
+        copyfile(paths.build_pdf, paths.output_pdf)
+        paths.output_log.unlink(missing_ok=True)
+        manifest.record(paths.output_pdf, digest)
+        if self._cache is not None:
+            self._cache.store(digest, paths.output_pdf)
+
+    def _list_items_to_compile(
+        self, manifest: _Manifest, build_dir: Path
+    ) -> tuple[list[tuple[Path, CompilePaths]], dict[Path, str]]:
+        digests = {}
+        stale = []
+        for input_path in chain(
+            self._input_dir.rglob("*.py"), self._input_dir.rglob("*.tex")
+        ):
+            digests[input_path] = self._digest(input_path)
+            paths = self._compute_compile_paths(input_path, build_dir)
+            if not manifest.is_fresh(paths.output_pdf, digests[input_path]):
+                stale.append((input_path, paths))
+        restored = _restore_cached(
+            self._cache,
+            manifest,
+            ((paths.output_pdf, digests[input_path]) for input_path, paths in stale),
         )
+        if restored:
+            manifest.save()
+        items = [
+            (input_path, paths)
+            for input_path, paths in stale
+            if paths.output_pdf not in restored
+        ]
+        return items, digests
+
+    def _digest(self, input_file: Path) -> str:
+        # The directories of the assets directory are linked next to the file to
+        # compile. The dependencies of generated files are only known once they are
+        # generated.
+        dependencies = [
+            (input_file.relative_to(self._input_dir).as_posix(), input_file)
+        ]
+        if input_file.suffix == ".tex":
+            dependencies.extend(_latex_dependencies(input_file, [self._assets_dir]))
+        return _digest(self._compiler.fingerprint, dependencies)
 
     def _generate_latex(self, python_file: Path, output_file: Path) -> None:
         compiled = compile(
@@ -30,5 +30,34 @@ class DefaultAssetsMetadataRetriever(
 
     def __call__(self, value: str) -> dict[str, Any] | None:
         self.assets[value] = self.assets.setdefault(value, 0) + 1
-        metadata_path = (self._assets_dir / Path(value)).with_suffix(".yml")
-        return load_yaml(metadata_path) if metadata_path.exists() else None
+        return _load_metadata((self._assets_dir / Path(value)).with_suffix(".yml"))
+
+
+_metadata: dict[Path, tuple[int, dict[str, Any] | None]] = {}
+"""Metadata of the assets of the process, with the mtime of their file (-1 if none)."""
+
+
+def _load_metadata(path: Path) -> dict[str, Any] | None:
+    """Load the metadata of an asset, reusing it until its file changes.
+
+    The same images are used by many templates, rendered by the same long-lived \
+    workers: after the first lookup of an asset, a lookup costs a single stat.
+
+    Args:
+        path: Path of the metadata file.
+
+    Returns:
+        The metadata, shared with the other lookups and not to be modified, or None \
+        if the asset has no metadata file.
+    """
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = -1
+    if path in _metadata:
+        cached_mtime_ns, metadata = _metadata[path]
+        if cached_mtime_ns == mtime_ns:
+            return metadata
+    metadata = load_yaml(path) if mtime_ns != -1 else None
+    _metadata[path] = (mtime_ns, metadata)
+    return metadata
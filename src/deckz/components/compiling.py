@@ -1,32 +1,365 @@
-from collections.abc import Iterable
-from pathlib import Path
-from subprocess import run
+import sys
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
+from logging import getLogger
+from os import getpid, killpg
+from pathlib import Path, PurePosixPath
+from shutil import move
+from signal import SIGTERM, signal
+from subprocess import PIPE, Popen, run
+from threading import current_thread, main_thread
+from types import FrameType
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, PositiveInt
 
+from ..configuring.settings import PathFromSettings
 from ..models import CompileResult
+from ..utils import hash_file
 from . import Compiler
 
+_logger = getLogger(__name__)
+
 
 class _DefaultCompilerExtraKwArgs(BaseModel):
+    model_config = ConfigDict(validate_default=True)
+
     build_command: tuple[str, ...]
+    format_command: tuple[str, ...] | None = None
+    format_option: str = "-latexoption=-fmt={}"
+    format_dir: PathFromSettings = "paths.latex_formats_dir"  # type: ignore[assignment]
 
 
 class DefaultCompiler(
     Compiler, key="default", extra_kwargs_class=_DefaultCompilerExtraKwArgs
 ):
-    def __init__(self, build_command: Iterable[str]) -> None:
+    def __init__(
+        self,
+        build_command: Iterable[str],
+        format_command: Iterable[str] | None,
+        format_option: str,
+        format_dir: Path,
+    ) -> None:
+        """Initialize an instance.
+
+        Args:
+            build_command: Command compiling a file, given as last argument.
+            format_command: Command dumping a preamble into a format file, e.g. \
+                `pdflatex -ini -interaction=nonstopmode &pdflatex mylatexformat.ltx`. \
+                `-jobname` and `-recorder` options are inserted after the \
+                executable and the preamble file is given as last argument. If \
+                set, the preambles of the compiled files are dumped once into \
+                formats, loaded by the compilations sharing the same preamble and \
+                the same local packages and classes.
+            format_option: Option loading a format, inserted after the executable \
+                of the build command. `{}` is replaced by the name of the format. \
+                The default passes `-fmt` to the engine run by latexmk.
+            format_dir: Directory in which to cache the format files.
+        """
         self._build_command = build_command
+        self._format_command = None if format_command is None else tuple(format_command)
+        self._format_option = format_option
+        self._format_dir = format_dir
+
+    @property
+    def fingerprint(self) -> str:
+        fingerprint = [type(self).__qualname__, *self._build_command]
+        if self._format_command is not None:
+            fingerprint.extend(["format:", *self._format_command, self._format_option])
+        return " ".join(fingerprint)
 
     def compile(self, file: Path) -> CompileResult:
-        completed_process = run(
-            [*self._build_command, file.name],
-            cwd=file.parent,
+        """Compile a file, stopping the compilation cleanly if terminated.
+
+        The compilation runs in its own process group. If the calling process \
+        receives SIGTERM (for example because it is a worker of a terminated pool), \
+        the whole group is terminated and the compilation outputs are removed, so that \
+        the next compilation does not start from truncated auxiliary files.
+
+        Args:
+            file: Path of the file to compile.
+
+        Returns:
+            The result of the compilation.
+        """
+        executable, *arguments = self._build_command
+        if self._format_command is not None:
+            # The format is given on the command line rather than with a `%&` line,
+            # so that the rendered file is left as is for the next builds
+            name = self._use_format(file, self._format_command)
+            if name is not None:
+                arguments.insert(0, self._format_option.format(name))
+        return _run_compilation([executable, *arguments, file.name], file)
+
+    def _use_format(self, file: Path, format_command: tuple[str, ...]) -> str | None:
+        content = file.read_text(encoding="utf8")
+        preamble, separator, _ = content.partition("\\begin{document}")
+        if content.startswith("%&") or not separator:
+            return None
+        hasher = sha256()
+        hasher.update(" ".join(format_command).encode())
+        hasher.update(preamble.encode())
+        preamble_name = f"preamble-{hasher.hexdigest()[:32]}"
+        dependencies = self._read_dependencies(preamble_name)
+        name = (
+            None
+            if dependencies is None
+            else _format_name(preamble_name, file.parent, dependencies)
+        )
+        if name is None or not (self._format_dir / f"{name}.fmt").exists():
+            name = self._dump_format(
+                file.parent, preamble_name, preamble, format_command
+            )
+            if name is None:
+                return None
+        link_path = file.parent / f"{name}.fmt"
+        if not link_path.is_symlink():
+            link_path.symlink_to(self._format_dir / link_path.name)
+        return name
+
+    def _read_dependencies(self, preamble_name: str) -> list[str] | None:
+        try:
+            dependencies: list[str] = loads(
+                self._dependencies_path(preamble_name).read_text(encoding="utf8")
+            )
+        except (FileNotFoundError, JSONDecodeError):
+            return None
+        return dependencies
+
+    def _dependencies_path(self, preamble_name: str) -> Path:
+        return self._format_dir / f"{preamble_name}.json"
+
+    def _dump_format(
+        self,
+        directory: Path,
+        preamble_name: str,
+        preamble: str,
+        format_command: tuple[str, ...],
+    ) -> str | None:
+        """Dump a preamble into a format, named after the preamble and its inputs.
+
+        The local files read by the preamble (classes, packages, inputs found from \
+        the compiled directory) are listed from the recorder output of the dump, so \
+        that editing them dumps a new format.
+
+        Args:
+            directory: Directory of the compiled file.
+            preamble_name: Name identifying the preamble and the format command.
+            preamble: Preamble to dump.
+            format_command: Command dumping the preamble.
+
+        Returns:
+            Name of the format dumped, None if the dump failed.
+        """
+        if preamble_name in _failed_formats:
+            return None
+        # Dumped next to the compiled file so that relative paths in the preamble
+        # resolve the same way
+        preamble_path = directory / f"{preamble_name}.tex"
+        preamble_path.write_text(
+            f"{preamble}\\begin{{document}}\\end{{document}}\n", encoding="utf8"
+        )
+        executable, *arguments = format_command
+        process = run(
+            [
+                executable,
+                f"-jobname={preamble_name}",
+                "-recorder",
+                *arguments,
+                preamble_path.name,
+            ],
+            cwd=directory,
             capture_output=True,
             encoding="utf8",
+            check=False,
         )
-        return CompileResult(
-            completed_process.returncode == 0,
-            completed_process.stdout,
-            completed_process.stderr,
+        dumped_path = preamble_path.with_suffix(".fmt")
+        recorder_path = preamble_path.with_suffix(".fls")
+        preamble_path.unlink()
+        if process.returncode != 0 or not dumped_path.exists():
+            _logger.warning(
+                "Could not dump the preamble of %s into a format, compiling without "
+                "format\n%s",
+                directory.name,
+                process.stdout,
+            )
+            recorder_path.unlink(missing_ok=True)
+            _failed_formats.add(preamble_name)
+            return None
+        dependencies = _recorded_inputs(recorder_path, preamble_name)
+        recorder_path.unlink()
+        name = _format_name(preamble_name, directory, dependencies)
+        self._format_dir.mkdir(parents=True, exist_ok=True)
+        format_path = self._format_dir / f"{name}.fmt"
+        tmp_path = format_path.with_name(f"{format_path.name}.{getpid()}.tmp")
+        move(dumped_path, tmp_path)
+        tmp_path.replace(format_path)
+        dependencies_path = self._dependencies_path(preamble_name)
+        tmp_path = dependencies_path.with_name(
+            f"{dependencies_path.name}.{getpid()}.tmp"
         )
+        tmp_path.write_text(dumps(dependencies), encoding="utf8")
+        tmp_path.replace(dependencies_path)
+        preamble_path.with_suffix(".log").unlink(missing_ok=True)
+        return name
+
+
+_failed_formats: set[str] = set()
+"""Preambles that could not be dumped by the current process, not to dump again."""
+
+
+def _recorded_inputs(recorder_path: Path, preamble_name: str) -> list[str]:
+    # Absolute paths are installed files, not expected to change between builds
+    inputs = set()
+    for line in recorder_path.read_text(encoding="utf8").splitlines():
+        kind, _, input_path = line.partition(" ")
+        path = PurePosixPath(input_path)
+        if (
+            kind == "INPUT"
+            and not path.is_absolute()
+            and not path.name.startswith(preamble_name)
+        ):
+            inputs.add(path.as_posix())
+    return sorted(inputs)
+
+
+def _format_name(preamble_name: str, directory: Path, dependencies: list[str]) -> str:
+    hasher = sha256(preamble_name.encode())
+    for dependency in dependencies:
+        path = directory / dependency
+        digest = hash_file(path) if path.is_file() else "missing"
+        hasher.update(f"{dependency}:{digest}\n".encode())
+    return f"{preamble_name}-{hasher.hexdigest()[:16]}"
+
+
+class _ConvergingCompilerExtraKwArgs(BaseModel):
+    engine_command: tuple[str, ...]
+    max_passes: PositiveInt = 5
+
+
+class ConvergingCompiler(
+    Compiler, key="converging", extra_kwargs_class=_ConvergingCompilerExtraKwArgs
+):
+    """Run a LaTeX engine until its auxiliary files stop changing.
+
+    The build directories are kept from one build to the next, so the auxiliary \
+    files of the previous build are the starting point of the next one: when an \
+    edit does not change the table of contents, the labels or the navigation, a \
+    single pass is enough.
+    """
+
+    def __init__(self, engine_command: Iterable[str], max_passes: int) -> None:
+        """Initialize an instance.
+
+        Args:
+            engine_command: Command running a single pass of the engine on a file, \
+                given as last argument, e.g. `xelatex -interaction=nonstopmode`.
+            max_passes: Maximum number of passes, in case the auxiliary files never \
+                converge.
+        """
+        self._engine_command = tuple(engine_command)
+        self._max_passes = max_passes
+
+    @property
+    def fingerprint(self) -> str:
+        return " ".join([type(self).__qualname__, *self._engine_command])
+
+    def compile(self, file: Path) -> CompileResult:
+        """Compile a file, passing again only while the auxiliary files change.
+
+        Args:
+            file: Path of the file to compile.
+
+        Returns:
+            The result of the last pass.
+        """
+        digests = _digest_auxiliary_files(file)
+        for _ in range(self._max_passes):
+            result = _run_compilation([*self._engine_command, file.name], file)
+            if not result.ok:
+                return result
+            previous_digests, digests = digests, _digest_auxiliary_files(file)
+            if digests == previous_digests:
+                return result
+        _logger.warning(
+            "Auxiliary files of %s did not converge after %d passes",
+            file.name,
+            self._max_passes,
+        )
+        return result
+
+
+_AUXILIARY_SUFFIXES = (".aux", ".toc", ".nav", ".snm", ".out")
+"""Suffixes of the files read back by the next pass of a LaTeX compilation."""
+
+
+def _digest_auxiliary_files(file: Path) -> dict[str, str | None]:
+    digests: dict[str, str | None] = {}
+    for suffix in _AUXILIARY_SUFFIXES:
+        path = file.with_suffix(suffix)
+        digests[suffix] = hash_file(path) if path.exists() else None
+    return digests
+
+
+def _run_compilation(command: list[str], file: Path) -> CompileResult:
+    with (
+        _sigterm_as_exit(),
+        Popen(
+            command,
+            cwd=file.parent,
+            stdout=PIPE,
+            stderr=PIPE,
+            encoding="utf8",
+            start_new_session=True,
+        ) as process,
+    ):
+        try:
+            stdout, stderr = process.communicate()
+        except BaseException:
+            _terminate(process)
+            for suffix in _OUTPUT_SUFFIXES:
+                file.with_suffix(suffix).unlink(missing_ok=True)
+            raise
+    return CompileResult(process.returncode == 0, stdout, stderr)
+
+
+_OUTPUT_SUFFIXES = (
+    ".aux",
+    ".fdb_latexmk",
+    ".fls",
+    ".log",
+    ".nav",
+    ".out",
+    ".pdf",
+    ".snm",
+    ".toc",
+    ".vrb",
+    ".xdv",
+)
+"""Suffixes of the files produced by LaTeX compilations."""
+
+
+def _terminate(process: "Popen[str]") -> None:
+    if sys.platform == "win32":
+        process.kill()
+    else:
+        killpg(process.pid, SIGTERM)
+    process.wait()
+
+
+@contextmanager
+def _sigterm_as_exit() -> Generator[None]:
+    # Signal handlers can only be set from the main thread
+    if current_thread() is not main_thread():
+        yield
+        return
+    previous_handler = signal(SIGTERM, _raise_system_exit)
+    try:
+        yield
+    finally:
+        signal(SIGTERM, previous_handler)
+
+
+def _raise_system_exit(signal_number: int, _frame: FrameType | None) -> None:
+    raise SystemExit(128 + signal_number)
@@ -1,16 +1,26 @@
 from collections.abc import Iterable, MutableSequence, MutableSet, Sequence, Set
-from dataclasses import dataclass
+from contextlib import suppress
+from dataclasses import dataclass, replace
 from enum import Enum
+from functools import cached_property
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
 from logging import getLogger
 from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import Pool as PoolType
+from os import getpid, walk
 from pathlib import Path, PurePosixPath
 from shutil import copyfile
-from typing import Any
+from threading import Event
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ByteSize, ConfigDict, PositiveInt
 
+from ..assets_caching import AssetsCache
 from ..configuring.settings import PathFromSettings
-from ..exceptions import DeckzError
+from ..exceptions import BuildCancelledError, DeckzError
 from ..models import (
     Deck,
     File,
@@ -23,16 +33,27 @@ from ..models import (
     Title,
     TitleOrContent,
 )
-from ..utils import copy_file_if_newer
+from ..utils import copy_file_if_newer, hash_file, is_newer
 from . import Builder, Compiler
 from .compiling import CompileResult
 from .rendering import Renderer
 
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+
+_CANCEL_POLLING_INTERVAL = 0.1
+"""Seconds between two checks of the cancel event while compiling."""
+
+_TIMINGS_SMOOTHING = 0.5
+"""Weight of the last duration in the recorded duration of an item."""
+
 
 class CompileType(Enum):
     Handout = "handout"
     Presentation = "presentation"
     PrintHandout = "print-handout"
+    FrontMatter = "front-matter"
 
 
 @dataclass(frozen=True)
@@ -59,6 +80,13 @@ class _DefaultBuilderExtraKwArgs(BaseModel):
     basedirs: tuple[PathFromSettings, ...] = ("paths.shared_dir", "paths.current_dir")  # type: ignore[assignment]
     renderer_key: str = "default"
     compiler_key: str = "default"
+    cache_dir: PathFromSettings = "paths.pdf_cache_dir"  # type: ignore[assignment]
+    use_cache: bool = True
+    cache_max_size: ByteSize = "1GiB"  # type: ignore[assignment]
+    timings_path: PathFromSettings = "paths.compile_timings"  # type: ignore[assignment]
+    derive_print_handout: bool = False
+    print_pages_per_sheet: PositiveInt = 2
+    assemble_handout: bool = False
 
 
 class DefaultBuilder(
@@ -78,6 +106,14 @@ class DefaultBuilder(
         basedirs: tuple[Path, ...],
         compiler_key: str,
         renderer_key: str,
+        cache_dir: Path,
+        use_cache: bool,
+        cache_max_size: int,
+        timings_path: Path,
+        derive_print_handout: bool,
+        print_pages_per_sheet: int,
+        assemble_handout: bool,
+        parts_to_rebuild: Set[PartName] | None = None,
     ):
         super().__init__(
             variables=variables,
@@ -85,6 +121,7 @@ class DefaultBuilder(
             build_presentation=build_presentation,
             build_handout=build_handout,
             build_print=build_print,
+            parts_to_rebuild=parts_to_rebuild,
         )
         self._deck_name = deck.name
         self._parts_slides = _SlidesNodeVisitor(basedirs).process(deck)
@@ -96,6 +133,12 @@ class DefaultBuilder(
         self._basedirs = basedirs
         self._compiler = self.new_dep(Compiler, compiler_key)
         self._renderer = self.new_dep(Renderer, renderer_key)
+        self._cache = AssetsCache(cache_dir, cache_max_size) if use_cache else None
+        self._timings = _CompileTimings(timings_path)
+        self._derive_print_handout = derive_print_handout
+        self._print_pages_per_sheet = print_pages_per_sheet
+        self._assemble_handout = assemble_handout
+        self._linked_dirs_fingerprint = ""
         self._logger = getLogger(__name__)
 
     def _name_compile_item(
@@ -107,56 +150,256 @@ class DefaultBuilder(
             else f"{self._deck_name}-{compile_type.value}"
         ).lower()
 
-    def build(self) -> bool:
+    def build(
+        self, cancel_event: Event | None = None, pool: PoolType | None = None
+    ) -> bool:
+        """Compile the items of the deck.
+
+        Args:
+            cancel_event: Event to set to cancel the build. BuildCancelledError is \
+                raised on cancellation, after terminating the pool if it was created \
+                by the build. With a given pool, the compilations not started yet are \
+                skipped and the running ones are waited for, so that the next build \
+                does not compile in the same build directories at the same time.
+            pool: Pool to compile the items in. A new one is created if None.
+
+        Returns:
+            True if all the compilations succeeded, False otherwise.
+        """
         items = self._list_items()
+        if not items:
+            self._logger.info("No PDF to rebuild.")
+            return True
         self._logger.info(f"Building {len(items)} PDFs.")
-        with Pool(min(cpu_count(), len(items))) as pool:
-            results = pool.starmap(self._build_item, items.items())
+        items = self._timings.sort_longest_first(items)
+        if self._cache is not None:
+            self._linked_dirs_fingerprint = self._fingerprint_linked_dirs()
+        if pool is None:
+            with Pool(min(cpu_count(), len(items))) as new_pool:
+                results = self._compile(items, cancel_event, new_pool, True)
+        else:
+            results = self._compile(items, cancel_event, pool, False)
+        self._timings.record(zip(items, results, strict=True))
+        if self._cache is not None:
+            self._cache.evict()
+        items_results = {
+            item_name: result.ok
+            for item_name, result in zip(items, results, strict=True)
+        }
         for item_name, result in zip(items, results, strict=True):
             if not result.ok:
                 self._logger.warning("Compilation %s errored", item_name)
                 self._logger.warning("Captured %s stderr\n%s", item_name, result.stderr)
                 self._logger.warning("Captured %s stdout\n%s", item_name, result.stdout)
-        return all(result.ok for result in results)
+        handout_name = self._name_compile_item(CompileType.Handout)
+        if self._assembles_handout:
+            handout_ok = self._assemble_handout_from_parts(items_results)
+        else:
+            handout_ok = items_results.get(handout_name, False)
+        if self._derives_print_handout and handout_ok:
+            self._logger.info("Deriving the print handout from the handout.")
+            _impose(
+                self._output_dir / f"{handout_name}.pdf",
+                self._output_dir
+                / f"{self._name_compile_item(CompileType.PrintHandout)}.pdf",
+                self._print_pages_per_sheet,
+            )
+        return all(items_results.values())
+
+    @property
+    def _derives_print_handout(self) -> bool:
+        return self._build_print and self._derive_print_handout
+
+    @property
+    def _assembles_handout(self) -> bool:
+        return (
+            self._assemble_handout
+            and (self._build_handout or self._derives_print_handout)
+            and self._template_skips_slides
+        )
+
+    @cached_property
+    def _template_skips_slides(self) -> bool:
+        # Without the front_matter variable, the front matter compilation would
+        # compile every slide, on top of the parts handouts
+        used_variables = self._renderer.used_variables(self._template)
+        if used_variables is not None and "front_matter" not in used_variables:
+            self._logger.warning(
+                "The template %s does not use the front_matter variable, compiling "
+                "the handout instead of assembling it",
+                self._template,
+            )
+            return False
+        return True
+
+    def _assemble_handout_from_parts(self, items_results: dict[str, bool]) -> bool:
+        front_matter_name = self._name_compile_item(CompileType.FrontMatter)
+        parts_names = [
+            self._name_compile_item(CompileType.Handout, name)
+            for name in self._parts_slides
+        ]
+        if front_matter_name not in items_results or not all(
+            items_results.get(name, True) for name in [front_matter_name, *parts_names]
+        ):
+            return False
+        self._logger.info("Assembling the handout from the parts handouts.")
+        _assemble(
+            self._output_dir / f"{front_matter_name}.pdf",
+            [self._output_dir / f"{name}.pdf" for name in parts_names],
+            self._output_dir / f"{self._name_compile_item(CompileType.Handout)}.pdf",
+        )
+        return True
+
+    def _compile(
+        self,
+        items: dict[str, CompileItem],
+        cancel_event: Event | None,
+        pool: PoolType,
+        owns_pool: bool,
+    ) -> list[CompileResult]:
+        # Workers of a shared pool skip the items of a build once this file exists
+        cancel_path = self._build_dir / f".cancelled-{uuid4().hex}"
+        # Items are sent one by one to keep the longest ones first
+        async_results = pool.starmap_async(
+            self._build_item,
+            ((name, item, cancel_path) for name, item in items.items()),
+            chunksize=1,
+        )
+        try:
+            while not async_results.ready():
+                if cancel_event is not None and cancel_event.is_set():
+                    # Terminating the workers stops their compilations, see
+                    # DefaultCompiler.compile. A pool shared with other builds is
+                    # kept, and its running compilations are waited for.
+                    if owns_pool:
+                        pool.terminate()
+                    else:
+                        self._build_dir.mkdir(parents=True, exist_ok=True)
+                        cancel_path.touch()
+                        async_results.wait()
+                    msg = "build cancelled"
+                    raise BuildCancelledError(msg)
+                async_results.wait(_CANCEL_POLLING_INTERVAL)
+        finally:
+            cancel_path.unlink(missing_ok=True)
+        return async_results.get()
 
     def _list_items(self) -> dict[str, CompileItem]:
         to_compile = {}
         all_slides = list(self._parts_slides.values())
         all_dependencies = frozenset().union(*self._dependencies.values())
-        if self._build_handout:
-            to_compile[self._name_compile_item(CompileType.Handout)] = CompileItem(
-                all_slides, all_dependencies, CompileType.Handout, True
-            )
-        if self._build_print:
+        parts_to_rebuild = (
+            self._parts_slides.keys()
+            if self._parts_to_rebuild is None
+            else self._parts_to_rebuild
+        )
+        # A derived print handout is imposed from the handout
+        if (self._build_handout or self._derives_print_handout) and parts_to_rebuild:
+            if self._assembles_handout:
+                to_compile[self._name_compile_item(CompileType.FrontMatter)] = (
+                    CompileItem(
+                        all_slides, all_dependencies, CompileType.FrontMatter, True
+                    )
+                )
+            else:
+                to_compile[self._name_compile_item(CompileType.Handout)] = CompileItem(
+                    all_slides, all_dependencies, CompileType.Handout, True
+                )
+        if self._build_print and not self._derive_print_handout and parts_to_rebuild:
             to_compile[self._name_compile_item(CompileType.PrintHandout)] = CompileItem(
                 all_slides, all_dependencies, CompileType.Handout, True
             )
         for name, slides in self._parts_slides.items():
+            handout_name = self._name_compile_item(CompileType.Handout, name)
+            # An assembled handout needs the handouts of every part
+            missing_handout = (
+                self._assembles_handout
+                and bool(parts_to_rebuild)
+                and not (self._output_dir / f"{handout_name}.pdf").is_file()
+            )
+            if name not in parts_to_rebuild and not missing_handout:
+                continue
             dependencies = self._dependencies[name]
-            if self._build_presentation:
+            if self._build_presentation and name in parts_to_rebuild:
                 to_compile[self._name_compile_item(CompileType.Presentation, name)] = (
                     CompileItem([slides], dependencies, CompileType.Presentation, False)
                 )
-            if self._build_handout:
-                to_compile[self._name_compile_item(CompileType.Handout, name)] = (
-                    CompileItem([slides], dependencies, CompileType.Handout, False)
+            if self._build_handout or self._assembles_handout:
+                to_compile[handout_name] = CompileItem(
+                    [slides], dependencies, CompileType.Handout, False
                 )
         return to_compile
 
-    def _build_item(self, name: str, item: CompileItem) -> CompileResult:
+    def _build_item(
+        self, name: str, item: CompileItem, cancel_path: Path
+    ) -> CompileResult:
+        if cancel_path.exists():
+            return CompileResult(False, "", "build cancelled")
         build_dir = self._setup_build_dir(name)
         latex_path = build_dir / f"{name}.tex"
         build_pdf_path = latex_path.with_suffix(".pdf")
         output_pdf_path = self._output_dir / f"{name}.pdf"
         self._render_latex(item, latex_path)
-        copied = self._copy_dependencies(item.dependencies, build_dir)
-        self._render_dependencies(copied)
+        self._prepare_dependencies(item.dependencies, build_dir)
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._compute_cache_key(item, latex_path)
+            if self._cache.restore(cache_key, output_pdf_path):
+                self._logger.debug("Reusing cached PDF for %s", name)
+                return CompileResult(True)
+        start = perf_counter()
         result = self._compiler.compile(latex_path)
+        result = replace(result, duration=perf_counter() - start)
         if result.ok:
             self._output_dir.mkdir(parents=True, exist_ok=True)
             copyfile(build_pdf_path, output_pdf_path)
+            if self._cache is not None and cache_key is not None:
+                self._cache.store(cache_key, build_pdf_path)
         return result
 
+    def _compute_cache_key(self, item: CompileItem, latex_path: Path) -> str:
+        """Hash everything that can change the PDF produced for an item.
+
+        The rendered dependencies are hashed from the build directory, so that \
+        changes in the variables or in the assets metadata are taken into account.
+
+        Args:
+            item: Item to compile.
+            latex_path: Path to the rendered main LaTeX file of the item.
+
+        Returns:
+            Hexadecimal digest identifying the item.
+        """
+        hasher = sha256()
+        hasher.update(self._compiler.fingerprint.encode())
+        hasher.update(self._linked_dirs_fingerprint.encode())
+        hasher.update(hash_file(latex_path).encode())
+        build_dir = latex_path.parent
+        rendered_paths = sorted(
+            self._dependency_build_path(dependency, build_dir).with_suffix("")
+            for dependency in item.dependencies
+        )
+        for rendered_path in rendered_paths:
+            hasher.update(str(rendered_path.relative_to(build_dir)).encode())
+            hasher.update(hash_file(rendered_path).encode())
+        return hasher.hexdigest()
+
+    def _fingerprint_linked_dirs(self) -> str:
+        # Hashing the content of every image would cost more than most compilations,
+        # so the linked directories are fingerprinted with their files metadata.
+        hasher = sha256()
+        for linked_dir in self._dirs_to_link:
+            for root, dirs, files in walk(linked_dir.resolve(), followlinks=True):
+                dirs.sort()
+                for file_name in sorted(files):
+                    path = Path(root) / file_name
+                    with suppress(FileNotFoundError):
+                        stat = path.stat()
+                        hasher.update(
+                            f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+                        )
+        return hasher.hexdigest()
+
     def _setup_build_dir(self, name: str) -> Path:
         target_build_dir = self._build_dir / name
         target_build_dir.mkdir(parents=True, exist_ok=True)
@@ -171,30 +414,33 @@ class DefaultBuilder(
             variables=self._variables,
             parts=item.parts,
             handout=item.compile_type
-            in [CompileType.Handout, CompileType.PrintHandout],
+            in [CompileType.Handout, CompileType.PrintHandout, CompileType.FrontMatter],
             toc=item.toc,
             print=item.compile_type is CompileType.PrintHandout,
+            front_matter=item.compile_type is CompileType.FrontMatter,
         )
 
-    def _copy_dependencies(
+    def _prepare_dependencies(
         self, dependencies: Set[Path], target_build_dir: Path
-    ) -> list[Path]:
-        copied = []
+    ) -> None:
         for dependency in dependencies:
-            for basedir in self._basedirs:
-                if dependency.is_relative_to(basedir):
-                    relative_path = dependency.relative_to(basedir)
-                    break
-            else:
-                raise ValueError
-            build_path = (target_build_dir / relative_path).with_suffix(".tex.j2")
-            if copy_file_if_newer(dependency, build_path):
-                copied.append(build_path)
-        return copied
+            build_path = self._dependency_build_path(dependency, target_build_dir)
+            if is_newer(build_path, dependency):
+                continue
+            # The copy of the template marks its rendering as up to date: rendering
+            # first leaves the dependency to render again if the worker is killed
+            build_path.parent.mkdir(parents=True, exist_ok=True)
+            self._renderer.render_to_path(dependency, build_path.with_suffix(""))
+            copy_file_if_newer(dependency, build_path)
 
-    def _render_dependencies(self, to_render: list[Path]) -> None:
-        for item in to_render:
-            self._renderer.render_to_path(item, item.with_suffix(""))
+    def _dependency_build_path(self, dependency: Path, target_build_dir: Path) -> Path:
+        for basedir in self._basedirs:
+            if dependency.is_relative_to(basedir):
+                relative_path = dependency.relative_to(basedir)
+                break
+        else:
+            raise ValueError
+        return (target_build_dir / relative_path).with_suffix(".tex.j2")
 
     def _setup_link(self, source: Path, target: Path) -> None:
         if not target.exists():
@@ -222,6 +468,192 @@ class DefaultBuilder(
         source.symlink_to(target)
 
 
+class _CompileTimings:
+    """Durations of the previous compilations of the items of a deck.
+
+    Used to start the longest compilations first, so that they do not end up \
+    running alone at the end of the build (longest processing time first).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._durations: dict[str, float] | None = None
+
+    @property
+    def durations(self) -> dict[str, float]:
+        if self._durations is None:
+            try:
+                self._durations = loads(self._path.read_text(encoding="utf8"))
+            except (FileNotFoundError, JSONDecodeError):
+                self._durations = {}
+        return self._durations
+
+    def sort_longest_first(
+        self, items: dict[str, CompileItem]
+    ) -> dict[str, CompileItem]:
+        """Sort items by decreasing expected duration.
+
+        Items never compiled before are estimated from their number of dependencies, \
+        at the average duration per dependency of the items already compiled.
+
+        Args:
+            items: Items to sort.
+
+        Returns:
+            Sorted items.
+        """
+        known = [
+            (self.durations[name], len(item.dependencies))
+            for name, item in items.items()
+            if name in self.durations
+        ]
+        known_dependencies = sum(n for _, n in known)
+        seconds_per_dependency = (
+            sum(d for d, _ in known) / known_dependencies if known_dependencies else 1.0
+        )
+
+        def expected_duration(name_item: tuple[str, CompileItem]) -> float:
+            name, item = name_item
+            if name in self.durations:
+                return self.durations[name]
+            return seconds_per_dependency * len(item.dependencies)
+
+        return dict(sorted(items.items(), key=expected_duration, reverse=True))
+
+    def record(self, results: Iterable[tuple[str, CompileResult]]) -> None:
+        """Record the durations of successful compilations.
+
+        Args:
+            results: Names of the items and results of their compilation.
+        """
+        updated = False
+        for name, result in results:
+            if not result.ok or result.duration is None:
+                continue
+            previous = self.durations.get(name, result.duration)
+            self.durations[name] = (
+                _TIMINGS_SMOOTHING * result.duration
+                + (1 - _TIMINGS_SMOOTHING) * previous
+            )
+            updated = True
+        if updated:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_name(f"{self._path.name}.{getpid()}.tmp")
+            tmp_path.write_text(dumps(self.durations, indent=2), encoding="utf8")
+            tmp_path.replace(self._path)
+
+
+def _assemble(front_matter: Path, parts: Sequence[Path], target: Path) -> None:
+    """Concatenate the front matter of a deck with the slides of its parts.
+
+    The pages preceding the first outline entry of a PDF (the title page and the \
+    table of contents with the usual templates) are its front matter: they are kept \
+    from the front matter compilation and dropped from the parts handouts. A PDF \
+    without outline is kept whole.
+
+    Args:
+        front_matter: PDF of the front matter compilation of the deck.
+        parts: Handouts of the parts of the deck, in order.
+        target: Path of the PDF to produce.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    reader = PdfReader(front_matter)
+    first_outlined_page = _first_outlined_page(reader)
+    writer.append(
+        reader,
+        pages=(
+            0,
+            len(reader.pages) if first_outlined_page is None else first_outlined_page,
+        ),
+        import_outline=False,
+    )
+    for part in parts:
+        reader = PdfReader(part)
+        writer.append(
+            reader, pages=(_first_outlined_page(reader) or 0, len(reader.pages))
+        )
+    tmp_path = target.with_name(f"{target.name}.{getpid()}.tmp")
+    with tmp_path.open("wb") as fh:
+        writer.write(fh)
+    tmp_path.replace(target)
+
+
+def _first_outlined_page(reader: "PdfReader") -> int | None:
+    pages: list[int] = []
+    outline: list[Any] = list(reader.outline)
+    while outline:
+        entry = outline.pop()
+        if isinstance(entry, list):
+            outline.extend(entry)
+        elif (page := reader.get_destination_page_number(entry)) is not None:
+            pages.append(page)
+    return min(pages, default=None)
+
+
+_PRINT_SHEET_SIZE = (595.28, 841.89)
+"""Width and height of the sheets of derived print handouts (A4), in points."""
+
+_PRINT_MARGIN = 28.35
+"""Margin around the pages on the sheets of derived print handouts (1cm), in points."""
+
+
+def _impose(source: Path, target: Path, pages_per_sheet: int) -> None:
+    """Lay out the pages of a PDF on printable sheets, stacked vertically.
+
+    Args:
+        source: PDF whose pages to lay out.
+        target: Path of the PDF to produce.
+        pages_per_sheet: Number of pages to stack on each sheet.
+    """
+    from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+
+    reader = PdfReader(source)
+    writer = PdfWriter()
+    sheet_width, sheet_height = _PRINT_SHEET_SIZE
+    cell_width = sheet_width - 2 * _PRINT_MARGIN
+    cell_height = (
+        sheet_height - (pages_per_sheet + 1) * _PRINT_MARGIN
+    ) / pages_per_sheet
+    for first in range(0, len(reader.pages), pages_per_sheet):
+        sheet = PageObject.create_blank_page(width=sheet_width, height=sheet_height)
+        last = min(first + pages_per_sheet, len(reader.pages))
+        for position, index in enumerate(range(first, last)):
+            page = reader.pages[index]
+            box = page.mediabox
+            width, height = float(box.width), float(box.height)
+            scale = min(cell_width / width, cell_height / height)
+            cell_bottom = sheet_height - (position + 1) * (cell_height + _PRINT_MARGIN)
+            x = _PRINT_MARGIN + (cell_width - width * scale) / 2
+            y = cell_bottom + (cell_height - height * scale) / 2
+            sheet.merge_transformed_page(
+                page,
+                Transformation()
+                .translate(-float(box.left), -float(box.bottom))
+                .scale(scale)
+                .translate(x, y),
+            )
+        writer.add_page(sheet)
+    tmp_path = target.with_name(f"{target.name}.{getpid()}.tmp")
+    with tmp_path.open("wb") as fh:
+        writer.write(fh)
+    tmp_path.replace(target)
+
+
+def recorded_build_duration(timings_path: Path) -> float | None:
+    """Sum the recorded compilation durations of the items of a deck.
+
+    Args:
+        timings_path: Path of the compilation timings of the deck.
+
+    Returns:
+        Total recorded duration in seconds, None if nothing was recorded.
+    """
+    durations = _CompileTimings(timings_path).durations
+    return sum(durations.values()) if durations else None
+
+
 class PartDependenciesNodeVisitor(NodeVisitor[[MutableSet[ResolvedPath]], None]):
     def process(self, deck: Deck) -> dict[PartName, set[ResolvedPath]]:
         return {
@@ -245,6 +677,46 @@ class PartDependenciesNodeVisitor(NodeVisitor[[MutableSet[ResolvedPath]], None])
             node.accept(self, dependencies)
 
 
+def affected_parts(deck: Deck, paths: Iterable[Path]) -> set[PartName] | None:
+    """Find the parts of a deck that depend on some paths.
+
+    A part depends on the files it includes and on the definitions of the sections it \
+    includes.
+
+    Args:
+        deck: Deck to search for the parts.
+        paths: Paths that changed.
+
+    Returns:
+        Names of the parts depending on at least one of the paths. None if one of the \
+        paths is not specific to any part (templates, variables, assets, etc), in \
+        which case all the parts should be considered affected.
+    """
+    parts_sources = _PartSourcesNodeVisitor().process(deck)
+    affected: set[PartName] = set()
+    for path in paths:
+        resolved_path = path.resolve()
+        path_parts = {
+            part_name
+            for part_name, sources in parts_sources.items()
+            if resolved_path in sources
+        }
+        if not path_parts:
+            return None
+        affected.update(path_parts)
+    return affected
+
+
+class _PartSourcesNodeVisitor(PartDependenciesNodeVisitor):
+    def visit_section(
+        self, section: Section, dependencies: MutableSet[ResolvedPath]
+    ) -> None:
+        dependencies.add(
+            ResolvedPath(section.resolved_path / f"{section.unresolved_path.name}.yml")
+        )
+        super().visit_section(section, dependencies)
+
+
 class _SlidesNodeVisitor(NodeVisitor[[MutableSequence[TitleOrContent], int], None]):
     def __init__(self, basedirs: Iterable[Path]) -> None:
         self._basedirs = tuple(basedirs)
@@ -1,9 +1,12 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Set
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from os import scandir
 from pathlib import Path, PurePath
 from sys import stderr
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic import BaseModel, ConfigDict
 from rich import print as rich_print
 from rich.tree import Tree
 
@@ -38,6 +41,7 @@ class _DefaultParserExtraKwArgs(BaseModel):
     local_latex_dir: PathFromSettings = "paths.local_latex_dir"  # type: ignore[assignment]
     shared_latex_dir: PathFromSettings = "paths.shared_latex_dir"  # type: ignore[assignment]
     file_extension: str = ".tex"
+    prefetch_workers: int = 0
 
 
 class DefaultParser(
@@ -50,7 +54,11 @@ class DefaultParser(
     """
 
     def __init__(
-        self, local_latex_dir: Path, shared_latex_dir: Path, file_extension: str
+        self,
+        local_latex_dir: Path,
+        shared_latex_dir: Path,
+        file_extension: str,
+        prefetch_workers: int,
     ) -> None:
         """Initialize an instance with the necessary path information.
 
@@ -60,10 +68,19 @@ class DefaultParser(
             shared_latex_dir: Path to the shared latex directory. Used during the \
                 includes resolving process
             file_extension: Extensions to consider during file resolving.
+            prefetch_workers: Number of threads reading and validating the section \
+                definitions ahead of the parsing, level by level. Helps on slow \
+                file systems. 0 to disable prefetching.
         """
         self._local_latex_dir = local_latex_dir
         self._shared_latex_dir = shared_latex_dir
         self._file_extension = file_extension
+        self._prefetch_workers = prefetch_workers
+
+    @property
+    def file_extension(self) -> str:
+        """Extension given to the files of the definitions, which have none."""
+        return self._file_extension
 
     def from_deck_definition(self, deck_definition_path: Path) -> Deck:
         """Parse a deck from a yaml definition.
@@ -110,36 +127,204 @@ class DefaultParser(
             ),
         )
 
+    def reparse(
+        self, deck: Deck, deck_definition_path: Path, changed_paths: Set[Path]
+    ) -> tuple[Deck, set[PartName]]:
+        """Parse a deck again after some of its sources changed.
+
+        Only the sections whose definition changed and the files whose candidate \
+        paths changed are parsed again, the rest of the previous deck is reused. The \
+        whole deck is parsed again if its definition changed.
+
+        Args:
+            deck: Previous version of the deck. Only its parts are parsed again.
+            deck_definition_path: Path to the yaml definition of the deck.
+            changed_paths: Paths that changed since the previous version was parsed.
+
+        Returns:
+            The parsed deck and the names of the parts that changed.
+        """
+        if any(deck_definition_path.is_relative_to(p) for p in changed_paths):
+            return super().reparse(deck, deck_definition_path, changed_paths)
+        deck_definition = DeckDefinition.model_validate(load_yaml(deck_definition_path))
+        parts = {}
+        changed_parts = set()
+        for part_definition in deck_definition.parts:
+            if part_definition.name not in deck.parts:
+                continue
+            previous_part = deck.parts[part_definition.name]
+            nodes, changed = self._reparse_nodes(
+                previous_part.nodes,
+                part_definition.sections,
+                default_titles=None,
+                base_unresolved_path=UnresolvedPath(PurePath()),
+                changed_paths=changed_paths,
+            )
+            if changed:
+                parts[part_definition.name] = Part(
+                    title=part_definition.title, nodes=nodes
+                )
+                changed_parts.add(part_definition.name)
+            else:
+                parts[part_definition.name] = previous_part
+        return Deck(name=deck_definition.name, parts=parts), changed_parts
+
     def _parse_parts(
         self, part_definitions: list[PartDefinition]
     ) -> dict[PartName, Part]:
-        parts = {}
-        for part_definition in part_definitions:
-            part_nodes: list[Node] = []
-            for node_include in part_definition.sections:
-                if isinstance(node_include, SectionInclude):
-                    part_nodes.append(
-                        self._parse_section(
-                            base_unresolved_path=UnresolvedPath(PurePath()),
-                            include_path=node_include.path,
-                            title=node_include.title,
-                            title_unset="title" not in node_include.model_fields_set,
-                            flavor=node_include.flavor,
-                        )
+        if self._prefetch_workers:
+            self._prefetch_section_definitions(part_definitions)
+        return {
+            part_definition.name: Part(
+                title=part_definition.title,
+                nodes=self._parse_nodes(
+                    part_definition.sections,
+                    default_titles=None,
+                    base_unresolved_path=UnresolvedPath(PurePath()),
+                ),
+            )
+            for part_definition in part_definitions
+        }
+
+    def _prefetch_section_definitions(
+        self, part_definitions: list[PartDefinition]
+    ) -> None:
+        """Load the section definitions of the parts in parallel, level by level.
+
+        The definitions end up in the caches used by the sequential parsing, which \
+        keeps the order of the nodes deterministic.
+
+        Args:
+            part_definitions: Definitions of the parts to prefetch.
+        """
+        level = [
+            (UnresolvedPath(PurePath()), node_include)
+            for part_definition in part_definitions
+            for node_include in part_definition.sections
+            if isinstance(node_include, SectionInclude)
+        ]
+        seen: set[tuple[UnresolvedPath, FlavorName]] = set()
+        with ThreadPoolExecutor(self._prefetch_workers) as executor:
+            while level:
+                to_fetch = []
+                for base_unresolved_path, section_include in level:
+                    key = (
+                        self._compute_unresolved_path(
+                            base_unresolved_path, section_include.path
+                        ),
+                        section_include.flavor,
                     )
-                else:
-                    part_nodes.append(
-                        self._parse_file(
-                            base_unresolved_path=UnresolvedPath(PurePath()),
-                            include_path=node_include.path,
-                            title=node_include.title,
-                        )
+                    if key not in seen:
+                        seen.add(key)
+                        to_fetch.append(key)
+                definitions = executor.map(
+                    self._prefetch_section_definition, (p for p, _ in to_fetch)
+                )
+                level = [
+                    (unresolved_path, node_include)
+                    for (unresolved_path, flavor), definition in zip(
+                        to_fetch, definitions, strict=True
                     )
-            parts[part_definition.name] = Part(
-                title=part_definition.title,
-                nodes=part_nodes,
+                    if definition is not None
+                    for flavor_definition in definition.flavors
+                    if flavor_definition.name == flavor
+                    for node_include in flavor_definition.includes
+                    if isinstance(node_include, SectionInclude)
+                ]
+
+    def _prefetch_section_definition(
+        self, unresolved_path: UnresolvedPath
+    ) -> SectionDefinition | None:
+        definition_path = self._resolve(
+            (unresolved_path / unresolved_path.name).with_suffix(".yml"), "file"
+        )
+        if definition_path is None:
+            return None
+        try:
+            return _load_section_definition(definition_path)
+        except Exception:
+            # Reported by the parsing
+            return None
+
+    def _reparse_nodes(
+        self,
+        previous_nodes: list[Node],
+        node_includes: list[NodeInclude],
+        default_titles: dict[IncludePath, str] | None,
+        base_unresolved_path: UnresolvedPath,
+        changed_paths: Set[Path],
+    ) -> tuple[list[Node], bool]:
+        if len(previous_nodes) != len(node_includes):
+            return (
+                self._parse_nodes(node_includes, default_titles, base_unresolved_path),
+                True,
+            )
+        nodes: list[Node] = []
+        changed = False
+        for previous_node, node_include in zip(
+            previous_nodes, node_includes, strict=True
+        ):
+            node = self._reparse_node(
+                previous_node,
+                node_include,
+                default_titles,
+                base_unresolved_path,
+                changed_paths,
             )
-        return parts
+            changed = changed or node is not previous_node
+            nodes.append(node)
+        return nodes, changed
+
+    def _reparse_node(
+        self,
+        previous_node: Node,
+        node_include: NodeInclude,
+        default_titles: dict[IncludePath, str] | None,
+        base_unresolved_path: UnresolvedPath,
+        changed_paths: Set[Path],
+    ) -> Node:
+        if not _SourcesChangedNodeVisitor(
+            self._local_latex_dir,
+            self._shared_latex_dir,
+            self._file_extension,
+            changed_paths,
+            recursive=True,
+        ).process(previous_node):
+            return previous_node
+        if (
+            isinstance(previous_node, Section)
+            and previous_node.parsing_error is None
+            and not _SourcesChangedNodeVisitor(
+                self._local_latex_dir,
+                self._shared_latex_dir,
+                self._file_extension,
+                changed_paths,
+                recursive=False,
+            ).process(previous_node)
+        ):
+            # The definition of the section did not change, only its descendants
+            section_definition = _load_section_definition(
+                previous_node.resolved_path
+                / f"{previous_node.unresolved_path.name}.yml"
+            )
+            for flavor_definition in section_definition.flavors:
+                if flavor_definition.name == previous_node.flavor:
+                    nodes, changed = self._reparse_nodes(
+                        previous_node.nodes,
+                        flavor_definition.includes,
+                        section_definition.default_titles,
+                        previous_node.unresolved_path,
+                        changed_paths,
+                    )
+                    return (
+                        replace(previous_node, nodes=nodes)
+                        if changed
+                        else previous_node
+                    )
+        (node,) = self._parse_nodes(
+            [node_include], default_titles, base_unresolved_path
+        )
+        return previous_node if node == previous_node else node
 
     def _parse_section(
         self,
@@ -173,15 +358,10 @@ class DefaultParser(
             return section
         section.resolved_path = definition_resolved_path.parent
         try:
-            content = load_yaml(definition_resolved_path)
+            section_definition = _load_section_definition(definition_resolved_path)
         except Exception as e:
             section.parsing_error = f"{e}"
             return section
-        try:
-            section_definition = SectionDefinition.model_validate(content)
-        except ValidationError as e:
-            section.parsing_error = f"{e}"
-            return section
         for flavor_definition in section_definition.flavors:
             if flavor_definition.name == flavor:
                 break
@@ -279,10 +459,10 @@ class DefaultParser(
     ) -> ResolvedPath | None:
         local_path = self._local_latex_dir / unresolved_path
         shared_path = self._shared_latex_dir / unresolved_path
-        existence_tester = Path.is_file if resolve_target == "file" else Path.is_dir
         for path in [local_path, shared_path]:
-            if existence_tester(path):
-                return ResolvedPath(path.resolve())
+            resolved_path = _listings.resolve(path, resolve_target)
+            if resolved_path is not None:
+                return resolved_path
         return None
 
     def _validate(self, deck: Deck) -> None:
@@ -293,6 +473,142 @@ class DefaultParser(
             raise DeckzError(msg)
 
 
+class _SourcesChangedNodeVisitor(NodeVisitor[[], bool]):
+    """Check whether the paths probed to parse a node changed."""
+
+    def __init__(
+        self,
+        local_latex_dir: Path,
+        shared_latex_dir: Path,
+        file_extension: str,
+        changed_paths: Set[Path],
+        recursive: bool,
+    ) -> None:
+        self._basedirs = (local_latex_dir, shared_latex_dir)
+        self._file_extension = file_extension
+        self._changed_paths = changed_paths
+        self._recursive = recursive
+
+    def process(self, node: Node) -> bool:
+        return node.accept(self)
+
+    def visit_file(self, file: File) -> bool:
+        return self._changed(file.unresolved_path.with_suffix(self._file_extension))
+
+    def visit_section(self, section: Section) -> bool:
+        definition_path = (
+            section.unresolved_path / section.unresolved_path.name
+        ).with_suffix(".yml")
+        return self._changed(definition_path) or (
+            self._recursive and any(node.accept(self) for node in section.nodes)
+        )
+
+    def _changed(self, unresolved_path: PurePath) -> bool:
+        return any(
+            (basedir / unresolved_path).is_relative_to(changed_path)
+            for basedir in self._basedirs
+            for changed_path in self._changed_paths
+        )
+
+
+class _DirectoryListings:
+    """Listings of the directories probed to resolve paths, read once each.
+
+    Resolving every include with stat calls is slow on network file systems: \
+    listing the directory of an include answers for all its siblings at once.
+    """
+
+    def __init__(self) -> None:
+        # Listings are keyed by resolved directory, so that the paths of a change
+        # invalidate them whatever the path used to reach the directory
+        self._listings: dict[Path, dict[str, tuple[bool, bool, bool]]] = {}
+        self._resolved_directories: dict[Path, Path] = {}
+
+    def resolve(
+        self, path: Path, resolve_target: Literal["file", "dir"]
+    ) -> ResolvedPath | None:
+        directory = self._resolve_directory(path.parent)
+        if directory not in self._listings:
+            self._listings[directory] = self._list(directory)
+        entries = self._listings[directory]
+        if path.name not in entries:
+            return None
+        is_file, is_dir, is_symlink = entries[path.name]
+        if not (is_file if resolve_target == "file" else is_dir):
+            return None
+        return ResolvedPath(path.resolve() if is_symlink else directory / path.name)
+
+    def invalidate(self, paths: Iterable[Path] | None = None) -> None:
+        # Changed symbolic links change the resolution of the directories
+        self._resolved_directories.clear()
+        if paths is None:
+            self._listings.clear()
+            return
+        for path in paths:
+            resolved_path = path.resolve()
+            self._listings.pop(resolved_path.parent, None)
+            for directory in [
+                d for d in self._listings if d.is_relative_to(resolved_path)
+            ]:
+                self._listings.pop(directory, None)
+
+    def _resolve_directory(self, directory: Path) -> Path:
+        if directory not in self._resolved_directories:
+            self._resolved_directories[directory] = directory.resolve()
+        return self._resolved_directories[directory]
+
+    @staticmethod
+    def _list(directory: Path) -> dict[str, tuple[bool, bool, bool]]:
+        try:
+            with scandir(directory) as entries:
+                return {
+                    e.name: (e.is_file(), e.is_dir(), e.is_symlink()) for e in entries
+                }
+        except (FileNotFoundError, NotADirectoryError):
+            return {}
+
+
+_listings = _DirectoryListings()
+
+
+def invalidate_listings(paths: Iterable[Path] | None = None) -> None:
+    """Forget the directory listings used to resolve includes.
+
+    The default parser lists each directory once per process. Long-running \
+    processes must call this function when files are created, moved or deleted.
+
+    Args:
+        paths: Paths that changed. Forget all the listings if None.
+    """
+    _listings.invalidate(paths)
+
+
+_section_definitions: dict[Path, tuple[int, int, SectionDefinition]] = {}
+"""Section definitions of the process, with the mtime and size of their file."""
+
+
+def _load_section_definition(path: Path) -> SectionDefinition:
+    """Load and validate a section definition, reusing it until its file changes.
+
+    Shared sections are included by many decks and parts: caching their definitions \
+    avoids reading and validating them again for each include.
+
+    Args:
+        path: Path of the section definition.
+
+    Returns:
+        The section definition.
+    """
+    stat = path.stat()
+    if path in _section_definitions:
+        mtime_ns, size, section_definition = _section_definitions[path]
+        if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+            return section_definition
+    section_definition = SectionDefinition.model_validate(load_yaml(path))
+    _section_definitions[path] = (stat.st_mtime_ns, stat.st_size, section_definition)
+    return section_definition
+
+
 class RichTreeVisitor(NodeVisitor[[UnresolvedPath], tuple[Tree | None, bool]]):
     def __init__(self, only_errors: bool = True) -> None:
         self._only_errors = only_errors
@@ -1,10 +1,10 @@
 from collections.abc import Callable
-from functools import cached_property
 from os.path import join as path_join
 from pathlib import Path
 from typing import Any
 
 from jinja2 import BaseLoader, Environment, TemplateNotFound, pass_context
+from jinja2.meta import find_referenced_templates, find_undeclared_variables
 from jinja2.runtime import Context
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -56,6 +56,9 @@ class _DefaultRendererExtraKwArgs(BaseModel):
     assets_dir: PathFromSettings = "paths.shared_dir"  # type: ignore[assignment]
 
 
+_environments: dict[str, Environment] = {}
+
+
 class DefaultRenderer(
     Renderer, key="default", extra_kwargs_class=_DefaultRendererExtraKwArgs
 ):
@@ -78,8 +81,38 @@ class DefaultRenderer(
             assets_metadata_retriever.assets,
         )
 
-    @cached_property
+    def included_templates(self, template_path: Path) -> set[Path]:
+        # Only the templates referenced by literal paths can be found without
+        # rendering
+        included: set[Path] = set()
+        to_visit = [template_path]
+        while to_visit:
+            path = to_visit.pop()
+            source = path.read_text(encoding="utf8")
+            for reference in find_referenced_templates(self._env.parse(source)):
+                if reference is not None and Path(reference) not in included:
+                    included.add(Path(reference))
+                    to_visit.append(Path(reference))
+        return included
+
+    def used_variables(self, template_path: Path) -> set[str] | None:
+        variables: set[str] = set()
+        for path in (template_path, *self.included_templates(template_path)):
+            source = path.read_text(encoding="utf8")
+            variables.update(find_undeclared_variables(self._env.parse(source)))
+        return variables
+
+    @property
     def _env(self) -> Environment:
+        # Environments are shared by the renderers of a process, so that long-running
+        # workers keep their compiled templates from one render to the next. They are
+        # not stored on the renderer, which is sent to the workers.
+        key = self._default_img_values.model_dump_json()
+        if key not in _environments:
+            _environments[key] = self._create_env()
+        return _environments[key]
+
+    def _create_env(self) -> Environment:
         env = Environment(
             loader=_AbsoluteLoader(),
             block_start_string=r"\BLOCK{",
@@ -2,7 +2,7 @@ from functools import reduce
 from pathlib import Path
 from typing import Annotated, Any, Self
 
-from appdirs import user_config_dir as appdirs_user_config_dir
+import appdirs
 from pydantic import (
     AfterValidator,
     BaseModel,
@@ -66,13 +66,14 @@ class GlobalPaths(BaseModel):
     shared_plt_pdf_dir: _Path = "{shared_dir}/plt"
     shared_plotly_pdf_dir: _Path = "{shared_dir}/pltly"
     templates_dir: _Path = "{git_dir}/templates"
+    deck_index: _Path = "{git_dir}/.deckz/index.sqlite"
     plt_dir: _Path = "{figures_dir}/plots"
     plotly_dir: _Path = "{figures_dir}/pltly"
     tikz_dir: _Path = "{figures_dir}/tikz"
     jinja2_dir: _Path = "{templates_dir}/jinja2"
     jinja2_main_template: _Path = "{jinja2_dir}/main.tex"
     user_config_dir: _Path = Field(
-        default_factory=lambda: Path(appdirs_user_config_dir(app_name))
+        default_factory=lambda: Path(appdirs.user_config_dir(app_name))
     )
     global_variables: _Path = "{git_dir}/global-variables.yml"
     github_issues: _Path = "{user_config_dir}/github-issues.yml"
@@ -80,6 +81,12 @@ class GlobalPaths(BaseModel):
     gdrive_secrets: _Path = "{user_config_dir}/gdrive-secrets.json"
     gdrive_credentials: _Path = "{user_config_dir}/gdrive-credentials.pickle"
     user_variables: _Path = "{user_config_dir}/user-variables.yml"
+    user_cache_dir: _Path = Field(
+        default_factory=lambda: Path(appdirs.user_cache_dir(app_name))
+    )
+    pdf_cache_dir: _Path = "{user_cache_dir}/pdf"
+    latex_formats_dir: _Path = "{user_cache_dir}/formats"
+    assets_cache_dir: _Path = "{user_cache_dir}/assets"
 
     def model_post_init(self, __context: Any) -> None:
         for field, value in self.__dict__.items():
@@ -104,6 +111,7 @@ def _company_variables_factory(data: dict[str, Any]) -> Path:
 
 class DeckPaths(GlobalPaths):
     build_dir: _Path = "{current_dir}/.build"
+    compile_timings: _Path = "{build_dir}/timings.json"
     pdf_dir: _Path = "{current_dir}/pdf"
     local_latex_dir: _Path = "{current_dir}/latex"
     company_variables: _Path = Field(default_factory=_company_variables_factory)
@@ -0,0 +1,353 @@
+"""Serve builds from a long-running process over a Unix domain socket.
+
+Every deckz invocation pays for the Python startup, the settings validation, the git \
+repository discovery and the creation of a pool of workers. The daemon pays for those \
+once: it keeps the settings of the decks it built and a pool of workers (which keep \
+their jinja2 environments) warm, and runs the `run`, `run_section`, `run_file` and \
+`run_assets` pipelines on request.
+
+The protocol is line-based JSON. A client sends a single request, optionally \
+overriding some paths of the deck settings:
+
+    {"pipeline": "run", "workdir": "/path/to/deck", "paths": {}, "kwargs": {...}}
+
+and the daemon answers with the log records emitted during the build, by the daemon \
+and by its workers, one per line, followed by the outcome of the build:
+
+    {"level": 20, "message": "Building 4 PDFs."}
+    {"ok": true, "error": null}
+
+A client closing the connection before the outcome cancels the build.
+"""
+
+from collections.abc import Callable
+from contextlib import suppress
+from json import dumps, loads
+from logging import Handler, LogRecord, getLogger
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import Pool, Queue
+from pathlib import Path
+from socketserver import StreamRequestHandler, UnixStreamServer
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Any
+
+from . import app_name
+from .exceptions import BuildCancelledError, DeckzError
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import Pool as PoolType
+    from socket import socket
+
+    from .configuring.settings import DeckSettings
+
+_logger = getLogger(__name__)
+
+_CANCEL_POLLING_INTERVAL = 0.1
+"""Seconds between two checks of the cancel event while forwarding a build."""
+
+
+def socket_path() -> Path:
+    """Compute the path of the daemon socket without loading any setting.
+
+    Returns:
+        Path of the daemon socket.
+    """
+    from appdirs import user_cache_dir
+
+    return Path(user_cache_dir(app_name)) / "daemon.sock"
+
+
+def forward(
+    pipeline: str,
+    workdir: Path,
+    cancel_event: Event | None = None,
+    paths: dict[str, Path] | None = None,
+    **kwargs: Any,
+) -> bool:
+    """Run a pipeline in the daemon if it is running.
+
+    Args:
+        pipeline: Name of the pipeline to run. One of run, run_section, run_file or \
+            run_assets.
+        workdir: Directory to run the pipeline in.
+        cancel_event: Event to set to cancel the build.
+        paths: Paths of the deck settings to override, by name, e.g. build_dir.
+        kwargs: Arguments of the pipeline, except for the settings, the cancel event \
+            and the pool. They must be serializable to JSON.
+
+    Returns:
+        True if the pipeline was run by the daemon, False if no daemon is running.
+
+    Raises:
+        BuildCancelledError: Raised if the build was cancelled.
+        DeckzError: Raised if the pipeline failed in the daemon.
+    """
+    from socket import socket
+
+    try:
+        from socket import AF_UNIX
+    except ImportError:
+        return False
+
+    path = socket_path()
+    if not path.exists():
+        return False
+    with socket(AF_UNIX) as client:
+        try:
+            client.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+        _logger.debug("Forwarding %s to the daemon listening on %s", pipeline, path)
+        request = {
+            "pipeline": pipeline,
+            "workdir": str(workdir.resolve()),
+            "paths": {name: str(path) for name, path in (paths or {}).items()},
+            "kwargs": kwargs,
+        }
+        client.sendall(f"{dumps(request)}\n".encode())
+        finished = Event()
+        if cancel_event is not None:
+            Thread(
+                target=_shutdown_on_cancel,
+                args=(client, cancel_event, finished),
+                daemon=True,
+            ).start()
+        try:
+            with client.makefile("r", encoding="utf8") as fh:
+                for message in map(loads, fh):
+                    if "level" in message:
+                        _logger.log(message["level"], message["message"])
+                    elif not message["ok"]:
+                        raise DeckzError(message["error"])
+                    else:
+                        return True
+        finally:
+            finished.set()
+    if cancel_event is not None and cancel_event.is_set():
+        msg = "build cancelled"
+        raise BuildCancelledError(msg)
+    msg = "the daemon closed the connection before the end of the build"
+    raise DeckzError(msg)
+
+
+def _shutdown_on_cancel(client: "socket", cancel_event: Event, finished: Event) -> None:
+    # Closing the connection cancels the build in the daemon and ends the reading of
+    # its messages
+    from socket import SHUT_RDWR
+
+    while not finished.wait(_CANCEL_POLLING_INTERVAL):
+        if cancel_event.is_set():
+            with suppress(OSError):
+                client.shutdown(SHUT_RDWR)
+            return
+
+
+class Daemon:
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._settings: dict[Path, tuple[tuple[int, ...], DeckSettings]] = {}
+        self._pool: PoolType | None = None
+
+    def serve(self) -> None:
+        """Serve requests until interrupted."""
+        self._remove_stale_socket()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        daemon = self
+
+        class _RequestHandler(StreamRequestHandler):
+            def handle(self) -> None:
+                daemon.handle(
+                    self.rfile.readline(), self.wfile.write, self.request.recv
+                )
+
+        # The records logged by the workers are logged again by the daemon, to be
+        # sent to the clients along with its own records
+        log_queue: Queue[LogRecord] = Queue()
+        log_listener = QueueListener(log_queue, _RelayingHandler())
+        log_listener.start()
+        try:
+            with (
+                Pool(initializer=_init_worker, initargs=(log_queue,)) as pool,
+                UnixStreamServer(str(self._path), _RequestHandler) as server,
+            ):
+                self._pool = pool
+                _logger.info("Listening on %s", self._path)
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    _logger.info("Stopped serving")
+                finally:
+                    self._path.unlink(missing_ok=True)
+        finally:
+            log_listener.stop()
+
+    def handle(
+        self,
+        raw_request: bytes,
+        write: Callable[[bytes], Any],
+        read: Callable[[int], bytes] | None = None,
+    ) -> None:
+        """Run a request, streaming its logs and outcome back to the client.
+
+        Args:
+            raw_request: Request, as sent by the client.
+            write: Function writing to the client.
+            read: Function reading from the client, used to cancel the build when \
+                the client closes the connection. The build cannot be cancelled if \
+                None.
+        """
+
+        def send(message: dict[str, Any]) -> None:
+            write(f"{dumps(message)}\n".encode())
+
+        cancel_event = Event()
+        if read is not None:
+            Thread(
+                target=_set_on_disconnect, args=(read, cancel_event), daemon=True
+            ).start()
+        handler = _ForwardingHandler(send)
+        root_logger = getLogger()
+        root_logger.addHandler(handler)
+        try:
+            request = loads(raw_request)
+            _logger.info("Running %s in %s", request["pipeline"], request["workdir"])
+            self._run(
+                request["pipeline"],
+                Path(request["workdir"]),
+                request.get("paths", {}),
+                request["kwargs"],
+                cancel_event,
+            )
+        except BuildCancelledError:
+            root_logger.removeHandler(handler)
+            _logger.info("Request cancelled by the client")
+        except Exception as e:
+            _logger.exception("Request failed")
+            root_logger.removeHandler(handler)
+            with suppress(OSError):
+                send({"ok": False, "error": str(e)})
+        else:
+            root_logger.removeHandler(handler)
+            with suppress(OSError):
+                send({"ok": True, "error": None})
+
+    def _run(
+        self,
+        pipeline: str,
+        workdir: Path,
+        paths: dict[str, str],
+        kwargs: dict[str, Any],
+        cancel_event: Event,
+    ) -> None:
+        from .components.parsing import invalidate_listings
+        from .pipelines import run, run_assets, run_file, run_section
+        from .utils import yaml_cache_info
+
+        deck_pipelines: dict[str, Callable[..., object]] = {
+            "run": run,
+            "run_section": run_section,
+            "run_file": run_file,
+        }
+        if pipeline != "run_assets" and pipeline not in deck_pipelines:
+            msg = f"unknown pipeline {pipeline}"
+            raise DeckzError(msg)
+        # Files are not watched by the daemon
+        invalidate_listings()
+        if pipeline == "run_assets":
+            run_assets(workdir, pool=self._pool, **kwargs)
+        else:
+            deck_pipelines[pipeline](
+                settings=self._deck_settings(workdir, paths),
+                cancel_event=cancel_event,
+                pool=self._pool,
+                **kwargs,
+            )
+        _logger.debug("Cache of the yaml files of the daemon: %s", yaml_cache_info())
+
+    def _deck_settings(self, workdir: Path, paths: dict[str, str]) -> "DeckSettings":
+        from .configuring.settings import DeckSettings
+
+        if workdir in self._settings:
+            stamp, settings = self._settings[workdir]
+            if stamp != self._settings_stamp(settings.paths.git_dir, workdir):
+                del self._settings[workdir]
+        if workdir not in self._settings:
+            settings = DeckSettings.from_yaml(workdir)
+            self._settings[workdir] = (
+                self._settings_stamp(settings.paths.git_dir, workdir),
+                settings,
+            )
+        _, settings = self._settings[workdir]
+        if paths:
+            # The cached settings are kept for the next requests
+            settings = settings.model_copy(deep=True)
+            for name, path in paths.items():
+                setattr(settings.paths, name, Path(path))
+        return settings
+
+    def _settings_stamp(self, git_dir: Path, workdir: Path) -> tuple[int, ...]:
+        from .utils import intermediate_dirs
+
+        return tuple(
+            _mtime_ns(d / "deckz.yml") for d in intermediate_dirs(git_dir, workdir)
+        )
+
+    def _remove_stale_socket(self) -> None:
+        from socket import AF_UNIX, socket
+
+        if not self._path.exists():
+            return
+        with socket(AF_UNIX) as client:
+            try:
+                client.connect(str(self._path))
+            except ConnectionRefusedError:
+                self._path.unlink()
+                return
+        msg = f"a daemon is already listening on {self._path}"
+        raise DeckzError(msg)
+
+
+class _RelayingHandler(Handler):
+    """Handle the records of the workers as if they were logged by the daemon."""
+
+    def emit(self, record: LogRecord) -> None:
+        getLogger(record.name).handle(record)
+
+
+class _ForwardingHandler(Handler):
+    def __init__(self, send: Callable[[dict[str, Any]], None]) -> None:
+        super().__init__()
+        self._send = send
+
+    def emit(self, record: LogRecord) -> None:
+        try:
+            self._send({"level": record.levelno, "message": record.getMessage()})
+        except OSError:
+            self.handleError(record)
+
+
+def _init_worker(log_queue: "Queue[LogRecord]") -> None:
+    # Workers are stopped by the daemon, not by the interrupt sent to the whole
+    # process group.
+    from signal import SIG_IGN, SIGINT, signal
+
+    signal(SIGINT, SIG_IGN)
+    root_logger = getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+
+
+def _set_on_disconnect(read: Callable[[int], bytes], event: Event) -> None:
+    # Clients do not send anything after their request: reading only returns when
+    # they close the connection
+    with suppress(OSError, ValueError):
+        read(1)
+    event.set()
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
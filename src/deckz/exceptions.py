@@ -12,3 +12,7 @@ class UnresolvableSectionError(DeckzError):
 
 class GitRepositoryNotFoundError(DeckzError):
     pass
+
+
+class BuildCancelledError(DeckzError):
+    pass
@@ -0,0 +1,572 @@
+"""Persist parsed decks and assets usage in a SQLite database.
+
+Parsing every deck of a repository means validating the settings of each deck and \
+reading every section definition they include, which takes tens of seconds on large \
+repositories. The index stores the decks as rows (decks, parts and nodes) along with \
+the stamps of the sources used to parse them: the deck definition, the settings, the \
+section definitions and the existence of the candidate paths of every include (a new \
+local file shadows a shared one). A deck is parsed again only if one of its sources \
+changed. The decks are found from the modification times of the directories of the \
+repository: only the directories in which entries were added, removed or renamed are \
+listed again.
+
+The same database indexes the assets used by each LaTeX file, by content hash of the \
+file along with the content hashes of the templates it includes: a file shared by \
+many decks is rendered once, and only again when it or one of its includes changes.
+"""
+
+from collections.abc import Iterable, Iterator, MutableMapping
+from contextlib import closing
+from json import dumps, loads
+from logging import getLogger
+from os import scandir
+from pathlib import Path, PurePath
+from sqlite3 import Connection, connect
+from typing import TYPE_CHECKING
+
+from .models import (
+    Deck,
+    File,
+    FlavorName,
+    Node,
+    NodeVisitor,
+    Part,
+    PartName,
+    ResolvedPath,
+    Section,
+    UnresolvedPath,
+)
+
+if TYPE_CHECKING:
+    from .configuring.settings import DeckSettings, GlobalSettings
+
+_logger = getLogger(__name__)
+
+_SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE directories (
+    path TEXT PRIMARY KEY,
+    stamp INTEGER NOT NULL,
+    deck INTEGER NOT NULL
+);
+CREATE TABLE decks (path TEXT PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE sources (
+    deck TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content INTEGER NOT NULL,
+    stamp INTEGER NOT NULL
+);
+CREATE TABLE parts (
+    deck TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    title TEXT
+);
+CREATE TABLE nodes (
+    deck TEXT NOT NULL,
+    part TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    parent INTEGER,
+    kind TEXT NOT NULL,
+    title TEXT,
+    unresolved_path TEXT NOT NULL,
+    resolved_path TEXT NOT NULL,
+    parsing_error TEXT,
+    flavor TEXT
+);
+CREATE TABLE rendered_files (hash TEXT PRIMARY KEY, includes TEXT NOT NULL);
+CREATE TABLE files_assets (hash TEXT NOT NULL, asset TEXT NOT NULL);
+CREATE INDEX sources_deck ON sources (deck);
+CREATE INDEX parts_deck ON parts (deck);
+CREATE INDEX nodes_deck ON nodes (deck);
+CREATE INDEX files_assets_asset ON files_assets (asset);
+"""
+
+_TABLES = (
+    "directories",
+    "decks",
+    "sources",
+    "parts",
+    "nodes",
+    "rendered_files",
+    "files_assets",
+)
+
+_MISSING = -1
+"""Stamp of a source that does not exist."""
+
+
+class DeckIndex:
+    """Parsed decks of a repository, stored in a SQLite database."""
+
+    def __init__(self, path: Path, git_dir: Path) -> None:
+        """Initialize an index.
+
+        Args:
+            path: Path of the SQLite database. Created if needed.
+            git_dir: Root of the repository the decks are searched in.
+        """
+        self._path = path
+        self._git_dir = git_dir
+
+    def decks(self) -> dict[Path, Deck]:
+        """Retrieve all the decks of the repository, parsing only the changed ones.
+
+        Returns:
+            Decks, indexed by their directory relative to the git directory.
+        """
+        from multiprocessing import Pool
+
+        from .configuring.settings import DeckSettings
+
+        with closing(_connect(self._path)) as connection, connection:
+            deck_paths = self._deck_paths(connection)
+            connection.execute(
+                "CREATE TEMP TABLE current (path TEXT PRIMARY KEY) WITHOUT ROWID"
+            )
+            connection.executemany(
+                "INSERT INTO current VALUES (?)", ((str(p),) for p in deck_paths)
+            )
+            for table in ("decks", "sources", "parts", "nodes"):
+                column = "path" if table == "decks" else "deck"
+                connection.execute(
+                    f"DELETE FROM {table} WHERE {column} NOT IN "
+                    "(SELECT path FROM current)"
+                )
+            stale = [p for p in deck_paths if not self._is_fresh(connection, p)]
+            if stale:
+                _logger.debug("Parsing %d decks missing from the index", len(stale))
+                with Pool() as pool:
+                    parsed = pool.map(
+                        _parse_deck,
+                        [DeckSettings.from_yaml(self._git_dir / p) for p in stale],
+                    )
+                for deck_path, deck, sources in parsed:
+                    self._store(connection, deck_path, deck, sources)
+            return {p: self._load(connection, p) for p in deck_paths}
+
+    def _deck_paths(self, connection: Connection) -> list[Path]:
+        """Find the decks of the repository, listing only the changed directories.
+
+        The modification time of a directory changes when entries are added to, \
+        removed from or renamed in it: a directory with an unchanged stamp still has \
+        the same subdirectories and deck definition.
+
+        Args:
+            connection: Connection to the index database.
+
+        Returns:
+            Directories of the decks, relative to the git directory.
+        """
+        indexed = {
+            Path(path): (stamp, bool(deck))
+            for path, stamp, deck in connection.execute(
+                "SELECT path, stamp, deck FROM directories"
+            )
+        }
+        removed = set()
+        to_list = [] if indexed else [Path()]
+        for directory, (stamp, _) in indexed.items():
+            current_stamp = _stamp(self._git_dir / directory, True)
+            if current_stamp == _MISSING:
+                removed.add(directory)
+            elif current_stamp != stamp:
+                to_list.append(directory)
+        listed: dict[Path, tuple[int, bool]] = {}
+        while to_list:
+            directory = to_list.pop()
+            # Stamp before listing, so that a change during the listing is seen later
+            stamp = _stamp(self._git_dir / directory, True)
+            try:
+                with scandir(self._git_dir / directory) as entries:
+                    children = [
+                        (entry.name, entry.is_dir(follow_symlinks=False))
+                        for entry in entries
+                        if entry.name == "deck.yml"
+                        or entry.is_dir(follow_symlinks=False)
+                    ]
+            except OSError:
+                removed.add(directory)
+                continue
+            listed[directory] = (stamp, ("deck.yml", False) in children)
+            to_list.extend(
+                directory / name
+                for name, is_dir in children
+                if is_dir
+                and name != ".git"
+                and directory / name not in indexed
+                and directory / name not in listed
+            )
+        if listed:
+            _logger.debug("Listed %d changed directories", len(listed))
+        connection.executemany(
+            "DELETE FROM directories WHERE path = ?", ((str(p),) for p in removed)
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO directories VALUES (?, ?, ?)",
+            ((str(p), stamp, deck) for p, (stamp, deck) in listed.items()),
+        )
+        return sorted(
+            directory
+            for directory, (_, deck) in (indexed | listed).items()
+            if deck and directory not in removed
+        )
+
+    def _is_fresh(self, connection: Connection, deck_path: Path) -> bool:
+        if (
+            connection.execute(
+                "SELECT 1 FROM decks WHERE path = ?", (str(deck_path),)
+            ).fetchone()
+            is None
+        ):
+            return False
+        return all(
+            _stamp(Path(path), content) == stamp
+            for path, content, stamp in connection.execute(
+                "SELECT path, content, stamp FROM sources WHERE deck = ?",
+                (str(deck_path),),
+            )
+        )
+
+    def _store(
+        self,
+        connection: Connection,
+        deck_path: Path,
+        deck: Deck,
+        sources: dict[Path, tuple[bool, int]],
+    ) -> None:
+        key = str(deck_path)
+        for table in ("sources", "parts", "nodes"):
+            connection.execute(f"DELETE FROM {table} WHERE deck = ?", (key,))
+        connection.execute(
+            "INSERT OR REPLACE INTO decks VALUES (?, ?)", (key, deck.name)
+        )
+        connection.executemany(
+            "INSERT INTO sources VALUES (?, ?, ?, ?)",
+            (
+                (key, str(path), content, stamp)
+                for path, (content, stamp) in sources.items()
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO parts VALUES (?, ?, ?, ?)",
+            (
+                (key, position, name, part.title)
+                for position, (name, part) in enumerate(deck.parts.items())
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((key, *row) for row in _node_rows(deck)),
+        )
+
+    def _load(self, connection: Connection, deck_path: Path) -> Deck:
+        key = str(deck_path)
+        (name,) = connection.execute(
+            "SELECT name FROM decks WHERE path = ?", (key,)
+        ).fetchone()
+        parts = {
+            PartName(part_name): Part(title=title, nodes=[])
+            for part_name, title in connection.execute(
+                "SELECT name, title FROM parts WHERE deck = ? ORDER BY position", (key,)
+            )
+        }
+        sections: dict[int, Section] = {}
+        for (
+            part_name,
+            node_id,
+            parent,
+            kind,
+            title,
+            unresolved_path,
+            resolved_path,
+            parsing_error,
+            flavor,
+        ) in connection.execute(
+            "SELECT part, id, parent, kind, title, unresolved_path, resolved_path, "
+            "parsing_error, flavor FROM nodes WHERE deck = ? ORDER BY id",
+            (key,),
+        ):
+            node: Node
+            if kind == "section":
+                node = sections[node_id] = Section(
+                    title=title,
+                    unresolved_path=UnresolvedPath(PurePath(unresolved_path)),
+                    resolved_path=ResolvedPath(Path(resolved_path)),
+                    parsing_error=parsing_error,
+                    flavor=FlavorName(flavor),
+                    nodes=[],
+                )
+            else:
+                node = File(
+                    title=title,
+                    unresolved_path=UnresolvedPath(PurePath(unresolved_path)),
+                    resolved_path=ResolvedPath(Path(resolved_path)),
+                    parsing_error=parsing_error,
+                )
+            if parent is None:
+                parts[part_name].nodes.append(node)
+            else:
+                sections[parent].nodes.append(node)
+        return Deck(name=name, parts=parts)
+
+
+class AssetsIndex:
+    """Assets used by LaTeX files, stored in a SQLite database."""
+
+    def __init__(self, path: Path, settings: "GlobalSettings") -> None:
+        """Initialize an index.
+
+        Args:
+            path: Path of the SQLite database. Created if needed.
+            settings: Settings used to render the files.
+        """
+        self._path = path
+        self._settings = settings
+
+    def files_using(self, asset: str, files: Iterable[Path]) -> set[Path]:
+        """Find the files using an asset, rendering only the files not indexed yet.
+
+        Args:
+            asset: Asset to search for, as used in the files, e.g. img/turing.
+            files: Files to search the asset in.
+
+        Returns:
+            Files using the asset.
+        """
+        from functools import partial
+        from multiprocessing import Pool
+
+        from .utils import hash_file
+
+        files_by_hash: dict[str, list[Path]] = {}
+        for path in files:
+            if path.is_file():
+                files_by_hash.setdefault(hash_file(path), []).append(path)
+        with closing(_connect(self._path)) as connection, connection:
+            connection.execute(
+                "CREATE TEMP TABLE current (hash TEXT PRIMARY KEY) WITHOUT ROWID"
+            )
+            connection.executemany(
+                "INSERT INTO current VALUES (?)", ((h,) for h in files_by_hash)
+            )
+            indexed = dict(
+                connection.execute(
+                    "SELECT hash, includes FROM rendered_files "
+                    "WHERE hash IN (SELECT hash FROM current)"
+                )
+            )
+            include_digests: dict[str, str] = {}
+            missing = [
+                h
+                for h in files_by_hash
+                if h not in indexed
+                or not _includes_unchanged(indexed[h], include_digests)
+            ]
+            if missing:
+                _logger.debug("Rendering %d files missing from the index", len(missing))
+                with Pool() as pool:
+                    rendered = pool.map(
+                        partial(_render_assets, settings=self._settings),
+                        [files_by_hash[h][0] for h in missing],
+                    )
+                for table in ("rendered_files", "files_assets"):
+                    connection.executemany(
+                        f"DELETE FROM {table} WHERE hash = ?", ((h,) for h in missing)
+                    )
+                connection.executemany(
+                    "INSERT INTO rendered_files VALUES (?, ?)",
+                    (
+                        (h, dumps(includes))
+                        for h, (_, includes) in zip(missing, rendered, strict=True)
+                    ),
+                )
+                connection.executemany(
+                    "INSERT INTO files_assets VALUES (?, ?)",
+                    (
+                        (h, file_asset)
+                        for h, (file_assets, _) in zip(missing, rendered, strict=True)
+                        for file_asset in file_assets
+                    ),
+                )
+            return {
+                path
+                for (h,) in connection.execute(
+                    "SELECT hash FROM files_assets WHERE asset = ? "
+                    "AND hash IN (SELECT hash FROM current)",
+                    (asset,),
+                )
+                for path in files_by_hash[h]
+            }
+
+
+def _includes_unchanged(includes: str, digests: dict[str, str]) -> bool:
+    """Check whether the templates included by an indexed file are unchanged.
+
+    Args:
+        includes: Content hashes of the included templates when the file was \
+            indexed, by path, as JSON.
+        digests: Current content hashes of the templates already checked, by path. \
+            Completed with the templates checked.
+
+    Returns:
+        True if every included template still has the same content.
+    """
+    for path, digest in loads(includes).items():
+        if path not in digests:
+            digests[path] = _digest_include(Path(path))
+        if digests[path] != digest:
+            return False
+    return True
+
+
+def _digest_include(path: Path) -> str:
+    from .utils import hash_file
+
+    return hash_file(path) if path.is_file() else "missing"
+
+
+def _connect(path: Path) -> Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    gitignore = path.parent / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n", encoding="utf8")
+    connection = connect(path)
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    if version != _SCHEMA_VERSION:
+        with connection:
+            for table in _TABLES:
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.executescript(_SCHEMA)
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    return connection
+
+
+def _render_assets(
+    path: Path, settings: "GlobalSettings"
+) -> tuple[list[str], dict[str, str]]:
+    from .components import Renderer
+
+    renderer = Renderer.new("default", settings)
+    _, assets_usage = renderer.render_to_str(path)
+    includes = {
+        str(include): _digest_include(include)
+        for include in renderer.included_templates(path)
+    }
+    return list(assets_usage), includes
+
+
+def _node_rows(
+    deck: Deck,
+) -> Iterator[
+    tuple[str, int, int | None, str, str | None, str, str, str | None, str | None]
+]:
+    """Flatten the nodes of a deck, parents first, with increasing ids.
+
+    Args:
+        deck: Deck to flatten.
+
+    Yields:
+        Rows of the nodes table, without the deck column.
+    """
+    node_id = 0
+    for part_name, part in deck.parts.items():
+        stack: list[tuple[Node, int | None]] = [
+            (node, None) for node in reversed(part.nodes)
+        ]
+        while stack:
+            node, parent = stack.pop()
+            flavor = node.flavor if isinstance(node, Section) else None
+            yield (
+                part_name,
+                node_id,
+                parent,
+                "file" if flavor is None else "section",
+                node.title,
+                str(node.unresolved_path),
+                str(node.resolved_path),
+                node.parsing_error,
+                flavor,
+            )
+            if isinstance(node, Section):
+                stack.extend((child, node_id) for child in reversed(node.nodes))
+            node_id += 1
+
+
+def _parse_deck(
+    settings: "DeckSettings",
+) -> tuple[Path, Deck, dict[Path, tuple[bool, int]]]:
+    from .components import Parser
+    from .components.parsing import DefaultParser
+    from .utils import intermediate_dirs
+
+    parser = Parser.new("default", settings)
+    deck = parser.from_deck_definition(settings.paths.deck_definition)
+    sources = {
+        path: (True, _stamp(path, True))
+        for path in (
+            settings.paths.deck_definition,
+            *(
+                d / "deckz.yml"
+                for d in intermediate_dirs(
+                    settings.paths.git_dir, settings.paths.current_dir
+                )
+            ),
+        )
+    }
+    sources_visitor = _SourcesNodeVisitor(
+        settings.paths.local_latex_dir,
+        settings.paths.shared_latex_dir,
+        parser.file_extension if isinstance(parser, DefaultParser) else ".tex",
+    )
+    for part in deck.parts.values():
+        for node in part.nodes:
+            node.accept(sources_visitor, sources)
+    return (
+        settings.paths.deck_definition.parent.relative_to(settings.paths.git_dir),
+        deck,
+        sources,
+    )
+
+
+class _SourcesNodeVisitor(NodeVisitor[[MutableMapping[Path, tuple[bool, int]]], None]):
+    """Stamp the paths probed by the default parser to resolve the nodes."""
+
+    def __init__(
+        self, local_latex_dir: Path, shared_latex_dir: Path, file_extension: str
+    ) -> None:
+        self._basedirs = (local_latex_dir, shared_latex_dir)
+        self._file_extension = file_extension
+
+    def visit_file(
+        self, file: File, sources: MutableMapping[Path, tuple[bool, int]]
+    ) -> None:
+        suffix = (
+            file.resolved_path.suffix
+            if file.parsing_error is None
+            else self._file_extension
+        )
+        for basedir in self._basedirs:
+            path = basedir / file.unresolved_path.with_suffix(suffix)
+            sources[path] = (False, _stamp(path, False))
+
+    def visit_section(
+        self, section: Section, sources: MutableMapping[Path, tuple[bool, int]]
+    ) -> None:
+        definition_path = (
+            section.unresolved_path / section.unresolved_path.name
+        ).with_suffix(".yml")
+        for basedir in self._basedirs:
+            path = basedir / definition_path
+            sources[path] = (True, _stamp(path, True))
+        for node in section.nodes:
+            node.accept(self, sources)
+
+
+def _stamp(path: Path, content: bool) -> int:
+    try:
+        stat = path.stat()
+    except OSError:
+        return _MISSING
+    return stat.st_mtime_ns if content else 0
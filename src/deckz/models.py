@@ -439,6 +439,9 @@ class CompileResult:
     stderr: str | None = ""
     """The complete stderr output during compilation."""
 
+    duration: float | None = None
+    """Seconds spent compiling, None if no compilation was needed."""
+
 
 ########################################################################################
 # Assets usage stats                                                                   #
@@ -1,19 +1,32 @@
 from collections.abc import Callable, Iterable, Set
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from json import JSONDecodeError, dumps, loads
 from logging import getLogger
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import Pool as PoolType
+from os import fsdecode, getpid
 from pathlib import Path
-from threading import Thread
-from time import time
+from threading import Event, Lock, Thread, Timer
 from typing import Any
 
 from rich.progress import BarColumn, Progress
-from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.events import (
+    EVENT_TYPE_CLOSED_NO_WRITE,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_OPENED,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
 from watchdog.observers import Observer
 
 from .components import Builder, Parser
 from .components.assets_building import AssetsBuilder
+from .components.deck_building import affected_parts, recorded_build_duration
+from .components.parsing import invalidate_listings
 from .configuring.settings import DeckSettings, GlobalSettings
 from .configuring.variables import get_variables
-from .exceptions import DeckzError
+from .exceptions import BuildCancelledError, DeckzError
 from .models import Deck, FlavorName, PartName
 from .utils import all_deck_settings
 
@@ -26,10 +39,37 @@ def _build(
     build_handout: bool,
     build_presentation: bool,
     build_print: bool,
+    parts_to_rebuild: Set[PartName] | None = None,
+    cancel_event: Event | None = None,
+    pool: PoolType | None = None,
+) -> None:
+    assets_builder = AssetsBuilder.new("default", settings)
+    assets_builder.build(pool)
+    if not _build_deck(
+        deck=deck,
+        settings=settings,
+        build_handout=build_handout,
+        build_presentation=build_presentation,
+        build_print=build_print,
+        parts_to_rebuild=parts_to_rebuild,
+        cancel_event=cancel_event,
+        pool=pool,
+    ):
+        msg = f"could not build {settings.paths.current_dir}, see the errors above"
+        raise DeckzError(msg)
+
+
+def _build_deck(
+    deck: Deck,
+    settings: DeckSettings,
+    build_handout: bool,
+    build_presentation: bool,
+    build_print: bool,
+    parts_to_rebuild: Set[PartName] | None = None,
+    cancel_event: Event | None = None,
+    pool: PoolType | None = None,
 ) -> bool:
     variables = get_variables(settings)
-    assets_builder = AssetsBuilder.new("default", settings)
-    assets_builder.build()
     builder = Builder.new(
         "default",
         settings,
@@ -38,8 +78,9 @@ def _build(
         build_handout=build_handout,
         build_presentation=build_presentation,
         build_print=build_print,
+        parts_to_rebuild=parts_to_rebuild,
     )
-    return builder.build()
+    return builder.build(cancel_event, pool)
 
 
 def run(
@@ -48,18 +89,41 @@ def run(
     build_presentation: bool,
     build_print: bool,
     parts_whitelist: Iterable[PartName] | None = None,
-) -> None:
+    changed_paths: Set[Path] | None = None,
+    cancel_event: Event | None = None,
+    pool: PoolType | None = None,
+    previous_deck: Deck | None = None,
+) -> Deck:
     parser = Parser.new("default", settings)
-    deck = parser.from_deck_definition(settings.paths.deck_definition)
+    reparsed_parts: set[PartName] = set()
+    if previous_deck is None or changed_paths is None:
+        deck = parser.from_deck_definition(settings.paths.deck_definition)
+    else:
+        deck, reparsed_parts = parser.reparse(
+            previous_deck, settings.paths.deck_definition, changed_paths
+        )
     if parts_whitelist is not None:
         deck.filter(parts_whitelist)
+    parts_to_rebuild = (
+        None if changed_paths is None else affected_parts(deck, changed_paths)
+    )
+    if parts_to_rebuild is not None:
+        parts_to_rebuild.update(reparsed_parts.intersection(deck.parts))
+        _logger.info(
+            "Rebuilding only the affected parts: %s",
+            ", ".join(sorted(parts_to_rebuild)) or "none",
+        )
     _build(
         deck=deck,
         settings=settings,
         build_handout=build_handout,
         build_presentation=build_presentation,
         build_print=build_print,
+        parts_to_rebuild=parts_to_rebuild,
+        cancel_event=cancel_event,
+        pool=pool,
     )
+    return deck
 
 
 def run_file(
@@ -68,6 +132,8 @@ def run_file(
     build_handout: bool,
     build_presentation: bool,
     build_print: bool,
+    cancel_event: Event | None = None,
+    pool: PoolType | None = None,
 ) -> None:
     _build(
         deck=Parser.new("default", settings).from_file(latex),
@@ -75,6 +141,8 @@ def run_file(
         build_handout=build_handout,
         build_presentation=build_presentation,
         build_print=build_print,
+        cancel_event=cancel_event,
+        pool=pool,
     )
 
 
@@ -85,6 +153,8 @@ def run_section(
     build_handout: bool,
     build_presentation: bool,
     build_print: bool,
+    cancel_event: Event | None = None,
+    pool: PoolType | None = None,
 ) -> None:
     _build(
         deck=Parser.new("default", settings).from_section(section, flavor),
@@ -92,6 +162,8 @@ def run_section(
         build_handout=build_handout,
         build_presentation=build_presentation,
         build_print=build_print,
+        cancel_event=cancel_event,
+        pool=pool,
     )
 
 
@@ -100,96 +172,361 @@ def run_all(
     build_handout: bool,
     build_presentation: bool,
     build_print: bool,
+    jobs: int | None = None,
+    shard: str | None = None,
+    timings: Path | None = None,
 ) -> None:
+    """Build all the decks of the project, sharing a single pool of workers.
+
+    Every deck submits its compilations to the same pool, so that the compilations \
+    of the next decks start as soon as workers are left idle by the last, slowest \
+    compilations of a deck. After a deck failed, the decks not started yet are \
+    skipped while the ones already started are completed.
+
+    Args:
+        directory: Path to the current directory. Will be used to find the project \
+            directory
+        build_handout: Produce PDFs without animations
+        build_presentation: Produce PDFs with animations
+        build_print: Produce printable PDFs
+        jobs: Maximum number of compilations to run in parallel. Defaults to the \
+            number of CPUs
+        shard: Only build the K-th of N groups of decks, formatted as K/N, see \
+            _select_shard
+        timings: Path of a timings file shared by all the runners. Balances the \
+            shards if shard is given, written after the build otherwise
+
+    Raises:
+        DeckzError: Raised if some decks could not be built.
+    """
     global_settings = GlobalSettings.from_yaml(directory)
     AssetsBuilder.new("default", global_settings).build()
     decks_settings = list(all_deck_settings(global_settings.paths.git_dir))
-    with Progress(
-        "[progress.description]{task.description}",
-        BarColumn(),
-        "[progress.percentage]{task.percentage:>3.0f}%",
-    ) as progress:
+    if shard is not None:
+        index, count = _parse_shard(shard)
+        decks_settings = _select_shard(
+            decks_settings, global_settings.paths.git_dir, index, count, timings
+        )
+        _logger.info(
+            "Building shard %d/%d: %s",
+            index,
+            count,
+            ", ".join(str(s.paths.current_dir) for s in decks_settings) or "no deck",
+        )
+    jobs = jobs or cpu_count()
+    failed = Event()
+    with (
+        Progress(
+            "[progress.description]{task.description}",
+            BarColumn(),
+            "[progress.percentage]{task.percentage:>3.0f}%",
+        ) as progress,
+        Pool(jobs) as pool,
+        # Threads only submit the compilations of their deck and wait for them:
+        # as many threads as workers keep the pool busy.
+        ThreadPoolExecutor(min(jobs, len(decks_settings) or 1)) as executor,
+    ):
         task_id = progress.add_task("Building decks…", total=len(decks_settings))
-        for deck_settings in decks_settings:
-            result = _build(
-                deck=Parser.new("default", deck_settings).from_deck_definition(
-                    deck_settings.paths.deck_definition
-                ),
-                settings=deck_settings,
-                build_handout=build_handout,
-                build_presentation=build_presentation,
-                build_print=build_print,
-            )
+
+        def build_deck(deck_settings: DeckSettings) -> bool | None:
+            if failed.is_set():
+                return None
+            try:
+                result = _build_deck(
+                    deck=Parser.new("default", deck_settings).from_deck_definition(
+                        deck_settings.paths.deck_definition
+                    ),
+                    settings=deck_settings,
+                    build_handout=build_handout,
+                    build_presentation=build_presentation,
+                    build_print=build_print,
+                    pool=pool,
+                )
+            except Exception:
+                _logger.exception(
+                    "Building %s errored", deck_settings.paths.current_dir
+                )
+                result = False
             if not result:
-                break
+                failed.set()
+                return False
             progress.update(task_id, advance=1)
+            return True
+
+        results = list(executor.map(build_deck, decks_settings))
+    failed_decks = [
+        str(deck_settings.paths.current_dir)
+        for deck_settings, result in zip(decks_settings, results, strict=True)
+        if result is False
+    ]
+    if failed_decks:
+        msg = "could not build the decks:\n" + "\n".join(failed_decks)
+        raise DeckzError(msg)
+    if timings is not None and shard is None:
+        _record_timings(decks_settings, global_settings.paths.git_dir, timings)
 
 
-def run_assets(directory: Path) -> None:
+def _parse_shard(shard: str) -> tuple[int, int]:
+    index, _, count = shard.partition("/")
+    try:
+        parsed_index, parsed_count = int(index), int(count)
+    except ValueError:
+        parsed_index, parsed_count = 0, 0
+    if not 1 <= parsed_index <= parsed_count:
+        msg = f"invalid shard {shard}, expected K/N with 1 <= K <= N"
+        raise DeckzError(msg)
+    return parsed_index, parsed_count
+
+
+def _select_shard(
+    decks_settings: list[DeckSettings],
+    git_dir: Path,
+    index: int,
+    count: int,
+    timings: Path | None = None,
+) -> list[DeckSettings]:
+    """Select the decks of a shard.
+
+    Without timings, decks are assigned by a stable hash of their path. With \
+    timings, decks are assigned greedily, longest first, to the shard with the lowest \
+    total duration so far, decks without timing counting for the average duration of \
+    the others. If the timings file is missing or has no timing for any of the decks, \
+    a warning is logged and decks are assigned by hash. Either way, the partition only depends on the deck paths and on the \
+    timings file, so that all the runners agree on it.
+
+    Args:
+        decks_settings: Settings of all the decks.
+        git_dir: Root of the repository, to identify the decks independently of the \
+            location of the checkout.
+        index: Index of the shard to select, starting at 1.
+        count: Number of shards.
+        timings: Path of a timings file shared by all the runners, see \
+            _record_timings.
+
+    Returns:
+        Settings of the decks of the shard.
+
+    Raises:
+        DeckzError: Raised if the timings file cannot be read.
+    """
+    deck_paths = {
+        s.paths.current_dir: s.paths.current_dir.relative_to(git_dir).as_posix()
+        for s in decks_settings
+    }
+    recorded = (
+        _load_timings(timings) if timings is not None and timings.exists() else {}
+    )
+    known = [recorded[p] for p in deck_paths.values() if p in recorded]
+    if not known:
+        if timings is not None:
+            _logger.warning(
+                "No timing recorded in %s for the decks to build, assigning them to "
+                "the shards by hash",
+                timings,
+            )
+        return [
+            s
+            for s in decks_settings
+            if _stable_hash(deck_paths[s.paths.current_dir]) % count == index - 1
+        ]
+    default_duration = sum(known) / len(known)
+    durations = {
+        current_dir: recorded.get(deck_path, default_duration)
+        for current_dir, deck_path in deck_paths.items()
+    }
+    sorted_decks_settings = sorted(
+        decks_settings,
+        key=lambda s: (
+            -durations[s.paths.current_dir],
+            deck_paths[s.paths.current_dir],
+        ),
+    )
+    shards_durations = [0.0] * count
+    selected = []
+    for deck_settings in sorted_decks_settings:
+        lightest = min(range(count), key=shards_durations.__getitem__)
+        shards_durations[lightest] += durations[deck_settings.paths.current_dir]
+        if lightest == index - 1:
+            selected.append(deck_settings)
+    return selected
+
+
+def _stable_hash(value: str) -> int:
+    # The builtin hash of strings is salted per process
+    return int.from_bytes(sha256(value.encode("utf8")).digest()[:8], "big")
+
+
+def _load_timings(timings: Path) -> dict[str, float]:
+    try:
+        recorded = loads(timings.read_text(encoding="utf8"))
+    except (OSError, JSONDecodeError) as e:
+        msg = f"could not read timings file {timings}: {e}"
+        raise DeckzError(msg) from e
+    if not isinstance(recorded, dict) or not all(
+        isinstance(d, int | float) for d in recorded.values()
+    ):
+        msg = f"invalid timings file {timings}, expected durations by deck path"
+        raise DeckzError(msg)
+    return recorded
+
+
+def _record_timings(
+    decks_settings: list[DeckSettings], git_dir: Path, timings: Path
+) -> None:
+    """Write the recorded compilation durations of decks to a timings file.
+
+    The file maps the deck paths, relative to the repository root, to their total \
+    compilation duration in seconds. Written after a full build, it can be shared \
+    with the runners of a sharded build to balance the shards.
+
+    Args:
+        decks_settings: Settings of the decks.
+        git_dir: Root of the repository.
+        timings: Path of the timings file to write.
+    """
+    recorded = {}
+    for deck_settings in decks_settings:
+        duration = recorded_build_duration(deck_settings.paths.compile_timings)
+        if duration is not None:
+            deck_path = deck_settings.paths.current_dir.relative_to(git_dir)
+            recorded[deck_path.as_posix()] = duration
+    timings.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = timings.with_name(f"{timings.name}.{getpid()}.tmp")
+    tmp_path.write_text(dumps(recorded, indent=2, sort_keys=True), encoding="utf8")
+    tmp_path.replace(timings)
+
+
+def run_assets(directory: Path, pool: PoolType | None = None) -> None:
     """Build all the project standalones (images, tikz, plots, etc).
 
     Args:
         directory: Path to the current directory. Will be used to find the project \
             directory
+        pool: Pool of workers to build the assets in. A pool is created if None.
     """
-    AssetsBuilder.new("default", GlobalSettings.from_yaml(directory)).build()
+    AssetsBuilder.new("default", GlobalSettings.from_yaml(directory)).build(pool)
 
 
 class _BaseEventHandler(FileSystemEventHandler):
-    def __init__[**P](
+    """Call a function once changes settle, without losing any of them.
+
+    Changed paths are accumulated until no new change happened for `minimum_delay` \
+    seconds. If a call is still running at that point, it is asked to cancel itself \
+    through its cancel event, and a single follow-up call with all the paths \
+    accumulated in the meantime is made as soon as it stops.
+    """
+
+    def __init__(
         self,
-        minimum_delay: int,
-        function: Callable[P, Any],
-        *args: P.args,
-        **kwargs: P.kwargs,
+        minimum_delay: float,
+        function: Callable[[frozenset[Path] | None, Event], Any],
     ) -> None:
         self._minimum_delay = minimum_delay
         self._function = function
-        self._function_args = args
-        self._function_kwargs = kwargs
-        self._last_compile = 0.0
+        self._lock = Lock()
+        self._changed_paths: set[Path] = set()
+        self._timer: Timer | None = None
         self._worker: Thread | None = None
-        self._first_build = True
+        self._cancel_event = Event()
 
-    def __call__(self) -> None:
+    def __call__(
+        self,
+        changed_paths: frozenset[Path] | None = None,
+        cancel_event: Event | None = None,
+    ) -> None:
+        if changed_paths is None:
+            _logger.info("Initial build")
+        else:
+            _logger.info("Detected changes, starting a new build")
         try:
-            self._compiling = True
-            if self._first_build:
-                self._first_build = False
-                _logger.info("Initial build")
-            else:
-                _logger.info("Detected changes, starting a new build")
-            try:
-                self._function(*self._function_args, **self._function_kwargs)
-                _logger.info("Build finished")
-            except Exception as e:
-                _logger.exception(str(e), extra={"markup": True})
-        finally:
-            self._compiling = False
+            self._function(changed_paths, cancel_event or Event())
+            _logger.info("Build finished")
+        except BuildCancelledError:
+            _logger.info("Build cancelled")
+        except Exception as e:
+            _logger.exception(str(e), extra={"markup": True})
 
     def dispatch(self, event: FileSystemEvent) -> None:
-        current_time = time()
-        if self._last_compile + self._minimum_delay > current_time:
-            return
-        if self._worker is not None and self._worker.is_alive():
-            _logger.info("Still on last build, not starting a new build")
+        if event.event_type in _IGNORED_EVENT_TYPES or (
+            event.is_directory and event.event_type == EVENT_TYPE_MODIFIED
+        ):
             return
-        self._last_compile = current_time
-        self._worker = Thread(target=self.__call__)
+        paths = _event_paths(event)
+        invalidate_listings(paths)
+        with self._lock:
+            self._changed_paths.update(paths)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = Timer(self._minimum_delay, self._on_changes_settled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+
+    def _on_changes_settled(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._worker is not None:
+                _logger.info("Cancelling the current build to start a new one")
+                self._cancel_event.set()
+                return
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        changed_paths = frozenset(self._changed_paths)
+        self._changed_paths.clear()
+        self._cancel_event = Event()
+        self._worker = Thread(
+            target=self._work, args=(changed_paths, self._cancel_event)
+        )
         self._worker.start()
 
+    def _work(self, changed_paths: frozenset[Path], cancel_event: Event) -> None:
+        self(changed_paths, cancel_event)
+        with self._lock:
+            self._worker = None
+            # The changes of a cancelled build still need to be built
+            if cancel_event.is_set():
+                self._changed_paths.update(changed_paths)
+            # If a timer is running, it will start the next build once it expires
+            if self._changed_paths and self._timer is None:
+                self._start_worker()
 
-def watch[**P](
-    minimum_delay: int,
+
+_IGNORED_EVENT_TYPES = frozenset([EVENT_TYPE_OPENED, EVENT_TYPE_CLOSED_NO_WRITE])
+"""Events triggered by reads, including the ones of the builds themselves."""
+
+
+def _event_paths(event: FileSystemEvent) -> frozenset[Path]:
+    paths = [event.src_path, event.dest_path] if event.dest_path else [event.src_path]
+    return frozenset(Path(fsdecode(path)) for path in paths)
+
+
+def watch(
+    minimum_delay: float,
     watch: Set[Path],
     avoid: Set[Path],
-    function: Callable[P, Any],
-    *function_args: P.args,
-    **function_kwargs: P.kwargs,
+    function: Callable[[frozenset[Path] | None, Event], Any],
 ) -> None:
-    event_handler = _BaseEventHandler(
-        minimum_delay, function, *function_args, **function_kwargs
-    )
+    """Call a function on changes to the watched directories.
+
+    Args:
+        minimum_delay: Number of seconds without changes to wait for before calling \
+            the function.
+        watch: Directories to watch recursively.
+        avoid: Directories to exclude from the watched ones.
+        function: Function to call on changes. It receives the changed paths (None \
+            for the initial call) and an event set when the call should be cancelled \
+            because newer changes are waiting to be built.
+
+    Raises:
+        DeckzError: Raised if the watching stops for another reason than a keyboard \
+            interrupt.
+    """
+    event_handler = _BaseEventHandler(minimum_delay, function)
     observer = Observer()
     dirs_to_avoid = avoid | {
         r_to_avoid
@@ -210,6 +547,7 @@ def watch[**P](
     try:
         observer.join()
     except KeyboardInterrupt:
+        event_handler.stop()
         observer.stop()
         observer.join()
         _logger.info("Stopped watching")
@@ -2,10 +2,13 @@
 
 from collections.abc import Iterable, Iterator
 from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from functools import _CacheInfo
+
     from .configuring.settings import DeckSettings
     from .models import Deck
 
@@ -25,13 +28,45 @@ def copy_file_if_newer(original: Path, copy: Path) -> bool:
     """
     from shutil import copyfile
 
-    if copy.exists() and copy.stat().st_mtime > original.stat().st_mtime:
+    if is_newer(copy, original):
         return False
     copy.parent.mkdir(parents=True, exist_ok=True)
-    copyfile(original, copy)
+    # Copy then rename so that an interrupted copy never leaves a truncated file that
+    # would look more recent than the original
+    tmp_copy = copy.with_name(f".{copy.name}.tmp")
+    copyfile(original, tmp_copy)
+    tmp_copy.replace(copy)
     return True
 
 
+def is_newer(path: Path, reference: Path) -> bool:
+    """Check whether `path` exists and was modified after `reference`.
+
+    Args:
+        path: Path of the file to check.
+        reference: Path of the file to compare to.
+
+    Returns:
+        True if `path` exists and is more recent than `reference`, False otherwise.
+    """
+    return path.exists() and path.stat().st_mtime > reference.stat().st_mtime
+
+
+def hash_file(path: Path) -> str:
+    """Compute the SHA-256 digest of a file content.
+
+    Args:
+        path: Path of the file to hash.
+
+    Returns:
+        Hexadecimal digest of the file content.
+    """
+    from hashlib import file_digest, sha256
+
+    with path.open("rb") as fh:
+        return file_digest(fh, sha256).hexdigest()
+
+
 def import_module_and_submodules(package_name: str) -> None:
     """Import all modules and submodules from a package.
 
@@ -98,10 +133,47 @@ def get_git_dir(path: Path) -> Path:
     return Path(Repository(repository).workdir).resolve()
 
 
+_YAML_CACHE_SIZE = 4096
+"""Maximum number of parsed yaml documents kept in memory."""
+
+
 def load_yaml(path: Path) -> Any:
-    from yaml import safe_load
+    """Load a yaml file, reusing its parsed content until the file changes.
 
-    return safe_load(path.read_text(encoding="utf8"))
+    Args:
+        path: Path of the yaml file.
+
+    Returns:
+        A copy of the parsed content, that can be modified by the caller.
+    """
+    from copy import deepcopy
+
+    # Resolved so that the paths leading to the same file share a cache entry
+    resolved_path = path.resolve()
+    stat = resolved_path.stat()
+    return deepcopy(_load_yaml(resolved_path, stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=_YAML_CACHE_SIZE)
+def _load_yaml(path: Path, mtime_ns: int, size: int) -> Any:
+    # mtime_ns and size are only part of the cache key
+    from yaml import load
+
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader  # type: ignore[assignment]
+
+    return load(path.read_text(encoding="utf8"), Loader=SafeLoader)
+
+
+def yaml_cache_info() -> "_CacheInfo":
+    """Report the hits and misses of the cache of [`load_yaml`][deckz.utils.load_yaml].
+
+    Returns:
+        Statistics of the cache.
+    """
+    return _load_yaml.cache_info()
 
 
 def load_all_yamls(paths: Iterable[Path]) -> Iterator[Any]:
@@ -121,9 +193,24 @@ def _parse_deck(settings: "DeckSettings") -> tuple[Path, "Deck"]:
     )
 
 
-def all_decks(git_dir: Path) -> dict[Path, "Deck"]:
+def all_decks(git_dir: Path, index_path: Path | None = None) -> dict[Path, "Deck"]:
+    """Parse all the decks that can be found recursively from the git directory.
+
+    Args:
+        git_dir: Path of the git directory.
+        index_path: Path of the deck index. If given, only the decks that changed \
+            since they were last indexed are parsed.
+
+    Returns:
+        Decks, indexed by their directory relative to the git directory.
+    """
     from multiprocessing import Pool
 
+    if index_path is not None:
+        from .indexing import DeckIndex
+
+        return DeckIndex(index_path, git_dir).decks()
+
     with Pool() as pool:
         return dict(pool.map(_parse_deck, list(all_deck_settings(git_dir))))
 
@@ -0,0 +1,92 @@
+import sys
+from collections.abc import Iterator
+from logging import DEBUG
+from multiprocessing.pool import Pool, ThreadPool
+from pathlib import Path
+from typing import Any, cast
+
+import plotly.io
+from pytest import LogCaptureFixture, MonkeyPatch, fixture, mark, raises
+
+from deckz.components.assets_building import PlotlyAssetsBuilder
+from deckz.exceptions import DeckzError
+
+_PLOTS = """\
+import plotly.graph_objects as go
+
+from deckz.components.assets_building import register_plotly
+
+
+@register_plotly()
+def exported():
+    return go.Figure(go.Scatter(x=[0, 1], y=[1, 0]))
+
+
+@register_plotly()
+def not_exported():
+    return go.Figure(go.Bar(x=["a"], y=[1]))
+
+
+@register_plotly()
+def not_built():
+    raise ValueError("invalid data")
+"""
+
+
+@fixture
+def plots_package(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[None]:
+    (tmp_path / "pltly").mkdir()
+    (tmp_path / "pltly" / "__init__.py").touch()
+    (tmp_path / "pltly" / "figures.py").write_text(_PLOTS)
+    monkeypatch.syspath_prepend(tmp_path)
+    yield
+    for name in [n for n in sys.modules if n.partition(".")[0] == "pltly"]:
+        del sys.modules[name]
+
+
+@mark.usefixtures("plots_package")
+def test_batch_export_falls_back_to_one_by_one(
+    tmp_path: Path, monkeypatch: MonkeyPatch, caplog: LogCaptureFixture
+) -> None:
+    exported: list[str] = []
+
+    def write_images(*args: Any, **kwargs: Any) -> None:
+        msg = "no browser"
+        raise RuntimeError(msg)
+
+    def write_image(figure: dict[str, Any], path: Path, **kwargs: Any) -> None:
+        exported.append(path.name)
+        if figure["data"][0]["type"] == "bar":
+            msg = "unsupported trace"
+            raise ValueError(msg)
+        path.write_bytes(b"%PDF")
+
+    monkeypatch.setattr(plotly.io, "write_images", write_images)
+    monkeypatch.setattr(plotly.io, "write_image", write_image)
+    output_dir = tmp_path / "pdf"
+    builder = PlotlyAssetsBuilder(
+        output_dir=output_dir,
+        cache_dir=tmp_path / "cache",
+        use_cache=False,
+        cache_max_size=0,
+        batch_export=True,
+    )
+
+    # Threads share the plots package and the patched export functions
+    with ThreadPool(1) as pool:
+        with (
+            caplog.at_level(DEBUG),
+            raises(DeckzError, match="errored for 2 plots"),
+        ):
+            builder.submit(cast("Pool", pool))()
+        assert exported == ["exported.pdf", "not-exported.pdf"]
+        assert (output_dir / "exported.pdf").read_bytes() == b"%PDF"
+        assert not (output_dir / "not-exported.pdf").exists()
+        assert not (output_dir / "not-built.pdf").exists()
+        assert "Built the figure of" in caplog.text
+
+        # Only the plots that errored are built again
+        exported.clear()
+        with raises(DeckzError, match="errored for 2 plots"):
+            builder.submit(cast("Pool", pool))()
+        assert exported == ["not-exported.pdf"]
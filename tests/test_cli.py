@@ -7,7 +7,7 @@ from unittest.mock import patch
 import appdirs
 from pdfminer.high_level import extract_pages, extract_text
 from pygit2 import init_repository
-from pytest import fixture
+from pytest import fixture, raises
 
 from deckz.cli import main
 
@@ -21,6 +21,7 @@ def working_dir(tmp_path: Path, monkeypatch: Any) -> Path:
     working_dir = tmp_dir / "company" / "abc"
     monkeypatch.chdir(working_dir)
     monkeypatch.setattr(appdirs, "user_config_dir", lambda _: str(tmp_dir))
+    monkeypatch.setattr(appdirs, "user_cache_dir", lambda _: str(tmp_path / "cache"))
     return working_dir
 
 
@@ -55,3 +56,15 @@ def test_check_all(working_dir: Path) -> None:
     n_pages, text = extract_info(working_dir / "pdf" / "abc-p1-presentation.pdf")
     assert n_pages == 14
     assert "John Doe" in text
+
+
+def test_check_all_jobs(working_dir: Path) -> None:
+    run_deckz("check-all", "--jobs", "2")
+
+    n_pages, _ = extract_info(working_dir / "pdf" / "abc-p1-presentation.pdf")
+    assert n_pages == 14
+
+
+def test_check_all_rejects_invalid_jobs(working_dir: Path) -> None:
+    with raises(SystemExit):
+        run_deckz("check-all", "--jobs", "0")
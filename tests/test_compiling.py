@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+from deckz.components.compiling import ConvergingCompiler, DefaultCompiler
+
+_FORMAT_SCRIPT = """\
+import sys
+from pathlib import Path
+
+jobname = sys.argv[1].removeprefix("-jobname=")
+Path(f"{jobname}.fmt").write_text("format")
+Path(f"{jobname}.fls").write_text("INPUT local.sty\\n")
+"""
+
+_BUILD_SCRIPT = """\
+import sys
+from pathlib import Path
+
+Path("arguments").write_text(" ".join(sys.argv[1:]))
+Path(sys.argv[-1]).with_suffix(".pdf").write_bytes(b"%PDF")
+"""
+
+_ENGINE_SCRIPT = """\
+import sys
+from pathlib import Path
+
+latex = Path(sys.argv[-1])
+passes = Path("passes")
+count = int(passes.read_text()) + 1 if passes.exists() else 1
+passes.write_text(str(count))
+# Only the bookmarks change, until the second pass
+latex.with_suffix(".out").write_text(f"bookmarks {min(count, 2)}")
+latex.with_suffix(".pdf").write_bytes(b"%PDF")
+"""
+
+
+def _script(path: Path, content: str) -> Path:
+    path.write_text(f"#!{sys.executable}\n{content}")
+    path.chmod(0o755)
+    return path
+
+
+def test_formats_are_loaded_without_editing_the_compiled_file(tmp_path: Path) -> None:
+    build_dir = tmp_path / "build"
+    build_dir.mkdir()
+    (build_dir / "local.sty").write_text("% package")
+    latex = build_dir / "deck.tex"
+    content = "\\documentclass{beamer}\n\\begin{document}\n\\end{document}\n"
+    latex.write_text(content)
+    compiler = DefaultCompiler(
+        build_command=[str(_script(tmp_path / "build-cmd", _BUILD_SCRIPT))],
+        format_command=[str(_script(tmp_path / "format-cmd", _FORMAT_SCRIPT))],
+        format_option="-fmt={}",
+        format_dir=tmp_path / "formats",
+    )
+
+    assert compiler.compile(latex).ok
+    first_arguments = (build_dir / "arguments").read_text()
+    assert compiler.compile(latex).ok
+
+    assert latex.read_text() == content
+    option, file_name = first_arguments.split()
+    assert option.startswith("-fmt=preamble-")
+    assert file_name == "deck.tex"
+    assert (build_dir / f"{option.removeprefix('-fmt=')}.fmt").exists()
+    assert (build_dir / "arguments").read_text() == first_arguments
+
+
+def test_passes_until_the_bookmarks_converge(tmp_path: Path) -> None:
+    latex = tmp_path / "deck.tex"
+    latex.write_text("\\documentclass{beamer}\n")
+    latex.with_suffix(".aux").write_text("aux")
+    compiler = ConvergingCompiler(
+        engine_command=[str(_script(tmp_path / "engine", _ENGINE_SCRIPT))],
+        max_passes=5,
+    )
+
+    assert compiler.compile(latex).ok
+
+    assert (tmp_path / "passes").read_text() == "3"
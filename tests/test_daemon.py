@@ -0,0 +1,47 @@
+from json import dumps, loads
+from pathlib import Path
+from shutil import copytree
+from typing import Any
+
+from pygit2 import init_repository
+from pytest import MonkeyPatch
+
+from deckz.components import Compiler
+from deckz.daemon import Daemon
+from deckz.models import CompileResult
+
+
+class _FailingCompiler(Compiler, key="test-failing"):
+    def __init__(self) -> None:
+        pass
+
+    def compile(self, file: Path) -> CompileResult:
+        return CompileResult(False, "", "! Undefined control sequence.")
+
+
+def test_failed_builds_are_reported_to_the_client(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    data_dir = tmp_path / "data"
+    copytree(Path(__file__).parent / "test_cli", data_dir)
+    init_repository(str(data_dir))
+    with (data_dir / "deckz.yml").open("a", encoding="utf8") as fh:
+        fh.write("  builder:\n    default:\n      compiler_key: test-failing\n")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    request = {
+        "pipeline": "run",
+        "workdir": str(data_dir / "company" / "abc"),
+        "kwargs": {
+            "build_handout": False,
+            "build_presentation": True,
+            "build_print": False,
+        },
+    }
+    messages: list[dict[str, Any]] = []
+
+    Daemon(tmp_path / "daemon.sock").handle(
+        dumps(request).encode(), lambda data: messages.append(loads(data))
+    )
+
+    assert messages[-1]["ok"] is False
+    assert "could not build" in messages[-1]["error"]
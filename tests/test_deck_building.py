@@ -0,0 +1,182 @@
+from multiprocessing import Pool
+from pathlib import Path
+from shutil import copytree
+from threading import Event, Timer
+from time import sleep
+
+from pygit2 import init_repository
+from pypdf import PdfReader, PdfWriter
+from pytest import fixture, raises
+
+from deckz.components import Compiler, Parser
+from deckz.configuring.settings import DeckSettings
+from deckz.exceptions import BuildCancelledError
+from deckz.models import CompileResult, Deck
+from deckz.pipelines import _build_deck
+
+_COMPILATION_DURATION = 0.5
+
+
+class _SlowCompiler(Compiler, key="test-slow"):
+    def __init__(self) -> None:
+        pass
+
+    def compile(self, file: Path) -> CompileResult:
+        journal = file.parents[2] / "journal"
+        with journal.open("a", encoding="utf8") as fh:
+            fh.write(f"start {file.stem}\n")
+        sleep(_COMPILATION_DURATION)
+        file.with_suffix(".pdf").write_bytes(b"%PDF")
+        with journal.open("a", encoding="utf8") as fh:
+            fh.write(f"end {file.stem}\n")
+        return CompileResult(True)
+
+
+class _OutlinedCompiler(Compiler, key="test-outlined"):
+    # Page widths identify the pages, the front matter pages precede the outline
+
+    def __init__(self) -> None:
+        pass
+
+    def compile(self, file: Path) -> CompileResult:
+        journal = file.parents[2] / "journal"
+        with journal.open("a", encoding="utf8") as fh:
+            fh.write(f"{file.stem}\n")
+        front_matter_widths, slides_widths = _PAGES[file.stem]
+        writer = PdfWriter()
+        for width in [*front_matter_widths, *slides_widths]:
+            writer.add_blank_page(width, 100)
+        if slides_widths:
+            writer.add_outline_item("Section", len(front_matter_widths))
+        with file.with_suffix(".pdf").open("wb") as fh:
+            writer.write(fh)
+        return CompileResult(True)
+
+
+_PAGES = {
+    "abc-front-matter": ([100, 101], []),
+    "abc-p1-handout": ([110, 111], [112, 113]),
+    "abc-p2-handout": ([120, 121], [122]),
+    "abc-handout": ([100, 101], [112, 113, 122]),
+}
+
+
+@fixture
+def settings(tmp_path: Path) -> DeckSettings:
+    data_dir = tmp_path / "data"
+    copytree(Path(__file__).parent / "test_cli", data_dir)
+    init_repository(str(data_dir))
+    settings = DeckSettings.from_yaml(data_dir / "company" / "abc")
+    settings.paths.build_dir = tmp_path / "build" / "deck"
+    settings.paths.pdf_dir = tmp_path / "pdf"
+    return settings
+
+
+def _parse(settings: DeckSettings) -> Deck:
+    return Parser.new("default", settings).from_deck_definition(
+        settings.paths.deck_definition
+    )
+
+
+def test_handout_is_assembled_from_the_parts_handouts(
+    tmp_path: Path, settings: DeckSettings
+) -> None:
+    settings.components.builder = {  # type: ignore[attr-defined]
+        "default": {
+            "compiler_key": "test-outlined",
+            "use_cache": False,
+            "assemble_handout": True,
+        }
+    }
+
+    assert _build_deck(
+        deck=_parse(settings),
+        settings=settings,
+        build_handout=True,
+        build_presentation=False,
+        build_print=False,
+    )
+
+    journal = (tmp_path / "build" / "journal").read_text(encoding="utf8")
+    assert sorted(journal.splitlines()) == [
+        "abc-front-matter",
+        "abc-p1-handout",
+        "abc-p2-handout",
+    ]
+    reader = PdfReader(tmp_path / "pdf" / "abc-handout.pdf")
+    assert [page.mediabox.width for page in reader.pages] == [
+        100,
+        101,
+        112,
+        113,
+        122,
+    ]
+
+
+def test_handout_is_compiled_if_the_template_ignores_front_matter(
+    tmp_path: Path, settings: DeckSettings
+) -> None:
+    template = settings.paths.jinja2_main_template
+    template.write_text(
+        template.read_text(encoding="utf8")
+        .replace("%% if not front_matter\n", "")
+        .replace("%% endif\n%% endfor\n%% endfor", "%% endfor\n%% endfor"),
+        encoding="utf8",
+    )
+    settings.components.builder = {  # type: ignore[attr-defined]
+        "default": {
+            "compiler_key": "test-outlined",
+            "use_cache": False,
+            "assemble_handout": True,
+        }
+    }
+
+    assert _build_deck(
+        deck=_parse(settings),
+        settings=settings,
+        build_handout=True,
+        build_presentation=False,
+        build_print=False,
+    )
+
+    journal = (tmp_path / "build" / "journal").read_text(encoding="utf8")
+    assert sorted(journal.splitlines()) == [
+        "abc-handout",
+        "abc-p1-handout",
+        "abc-p2-handout",
+    ]
+
+
+def test_cancelling_a_build_on_a_shared_pool_waits_for_its_compilations(
+    tmp_path: Path, settings: DeckSettings
+) -> None:
+    settings.components.builder = {  # type: ignore[attr-defined]
+        "default": {"compiler_key": "test-slow", "use_cache": False}
+    }
+    deck = _parse(settings)
+    journal = tmp_path / "build" / "journal"
+    cancel_event = Event()
+
+    with Pool(2) as pool:
+        Timer(_COMPILATION_DURATION / 2, cancel_event.set).start()
+        with raises(BuildCancelledError):
+            _build_deck(
+                deck=deck,
+                settings=settings,
+                build_handout=True,
+                build_presentation=True,
+                build_print=False,
+                cancel_event=cancel_event,
+                pool=pool,
+            )
+        lines = journal.read_text(encoding="utf8").splitlines()
+        sleep(2 * _COMPILATION_DURATION)
+
+        # The running compilations finished before the build returned, the others
+        # were skipped
+        assert len(lines) == 4
+        assert {line.split()[1] for line in lines if line.startswith("start")} == {
+            line.split()[1] for line in lines if line.startswith("end")
+        }
+        assert journal.read_text(encoding="utf8").splitlines() == lines
+        assert not list((tmp_path / "build" / "deck").glob(".cancelled-*"))
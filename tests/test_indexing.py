@@ -0,0 +1,98 @@
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+from shutil import copytree
+
+from pygit2 import init_repository
+from pytest import MonkeyPatch
+
+import deckz.indexing
+from deckz.indexing import DeckIndex, _connect
+from deckz.models import Node, PartName, Section
+
+
+def _deck_paths(index: DeckIndex, db: Path) -> list[Path]:
+    with closing(_connect(db)) as connection, connection:
+        return index._deck_paths(connection)  # noqa: SLF001
+
+
+def test_only_changed_directories_are_listed(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    repository = tmp_path / "repository"
+    for deck in ("company/abc", "company/def", "other/ghi"):
+        (repository / deck).mkdir(parents=True)
+        (repository / deck / "deck.yml").touch()
+    (repository / ".git" / "objects").mkdir(parents=True)
+    (repository / ".git" / "objects" / "deck.yml").touch()
+    index = DeckIndex(tmp_path / "index.db", repository)
+    db = tmp_path / "index.db"
+
+    assert _deck_paths(index, db) == [
+        Path("company/abc"),
+        Path("company/def"),
+        Path("other/ghi"),
+    ]
+
+    listed: list[Path] = []
+    original_scandir = deckz.indexing.scandir
+
+    def scandir(path: Path) -> object:
+        listed.append(path)
+        return original_scandir(path)
+
+    monkeypatch.setattr(deckz.indexing, "scandir", scandir)
+    assert _deck_paths(index, db) == [
+        Path("company/abc"),
+        Path("company/def"),
+        Path("other/ghi"),
+    ]
+    assert listed == []
+
+    (repository / "company" / "def" / "deck.yml").unlink()
+    (repository / "company" / "new" / "nested").mkdir(parents=True)
+    (repository / "company" / "new" / "nested" / "deck.yml").touch()
+    (repository / "other" / "ghi" / "deck.yml").unlink()
+    (repository / "other" / "ghi").rmdir()
+
+    assert _deck_paths(index, db) == [
+        Path("company/abc"),
+        Path("company/new/nested"),
+    ]
+    assert set(listed) == {
+        repository / "company",
+        repository / "company" / "def",
+        repository / "company" / "new",
+        repository / "company" / "new" / "nested",
+        repository / "other",
+    }
+
+
+def _parsing_errors(nodes: Iterable[Node]) -> list[str]:
+    errors = []
+    for node in nodes:
+        if node.parsing_error is not None:
+            errors.append(node.parsing_error)
+        if isinstance(node, Section):
+            errors.extend(_parsing_errors(node.nodes))
+    return errors
+
+
+def test_new_files_with_the_configured_extension_are_detected(tmp_path: Path) -> None:
+    repository = tmp_path / "repository"
+    copytree(Path(__file__).parent / "test_cli", repository)
+    init_repository(str(repository))
+    with (repository / "deckz.yml").open("a", encoding="utf8") as fh:
+        fh.write("  parser:\n    default:\n      file_extension: .ltx\n")
+    latex_dir = repository / "company" / "abc" / "latex"
+    for path in latex_dir.rglob("*.tex"):
+        path.rename(path.with_suffix(".ltx"))
+    (latex_dir / "first-section" / "advanced.ltx").unlink()
+    index = DeckIndex(tmp_path / "index.db", repository)
+
+    (deck,) = index.decks().values()
+    assert len(_parsing_errors(deck.parts[PartName("p1")].nodes)) == 1
+
+    (latex_dir / "first-section" / "advanced.ltx").write_text("Advanced\n")
+    (deck,) = index.decks().values()
+    assert _parsing_errors(deck.parts[PartName("p1")].nodes) == []
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from deckz.components.parsing import _DirectoryListings
+
+
+def test_listings_are_invalidated_whatever_the_path_used(tmp_path: Path) -> None:
+    directory = tmp_path / "latex"
+    directory.mkdir()
+    (tmp_path / "link").symlink_to(directory)
+    listings = _DirectoryListings()
+    through_link = tmp_path / "link" / "new.tex"
+    through_parent = directory / ".." / "latex" / "new.tex"
+
+    assert listings.resolve(through_link, "file") is None
+    assert listings.resolve(through_parent, "file") is None
+    (directory / "new.tex").touch()
+    listings.invalidate([directory / "new.tex"])
+
+    assert listings.resolve(through_link, "file") == directory / "new.tex"
+    assert listings.resolve(through_parent, "file") == directory / "new.tex"
@@ -0,0 +1,138 @@
+from collections import Counter
+from collections.abc import Callable
+from json import dumps
+from pathlib import Path
+from threading import Event
+from time import monotonic, sleep
+from types import SimpleNamespace
+from typing import cast
+
+from pytest import LogCaptureFixture, mark
+from watchdog.events import (
+    DirModifiedEvent,
+    FileClosedNoWriteEvent,
+    FileModifiedEvent,
+    FileOpenedEvent,
+)
+
+from deckz.configuring.settings import DeckSettings
+from deckz.exceptions import BuildCancelledError
+from deckz.pipelines import _BaseEventHandler, _select_shard
+
+_DELAY = 0.05
+
+
+def _deck_settings(current_dir: Path) -> DeckSettings:
+    return cast(
+        "DeckSettings", SimpleNamespace(paths=SimpleNamespace(current_dir=current_dir))
+    )
+
+
+@mark.parametrize("with_timings", [False, True])
+@mark.parametrize("count", [1, 2, 3, 7])
+def test_shards_cover_every_deck_once(
+    tmp_path: Path, count: int, with_timings: bool
+) -> None:
+    decks_settings = [
+        _deck_settings(tmp_path / f"company{i % 3}" / f"deck{i}") for i in range(20)
+    ]
+    timings = None
+    if with_timings:
+        timings = tmp_path / "timings.json"
+        timings.write_text(
+            dumps({f"company{i % 3}/deck{i}": float(i) for i in range(0, 20, 2)})
+        )
+
+    selected = Counter(
+        deck_settings.paths.current_dir
+        for index in range(1, count + 1)
+        for deck_settings in _select_shard(
+            decks_settings, tmp_path, index, count, timings
+        )
+    )
+
+    assert selected == Counter(s.paths.current_dir for s in decks_settings)
+
+
+def test_shards_do_not_depend_on_decks_order(tmp_path: Path) -> None:
+    decks_settings = [_deck_settings(tmp_path / f"deck{i}") for i in range(20)]
+
+    shard = _select_shard(decks_settings, tmp_path, 1, 3)
+    reversed_shard = _select_shard(decks_settings[::-1], tmp_path, 1, 3)
+
+    assert {s.paths.current_dir for s in shard} == {
+        s.paths.current_dir for s in reversed_shard
+    }
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = monotonic() + timeout
+    while not condition():
+        assert monotonic() < deadline, "timed out"
+        sleep(0.01)
+
+
+def test_burst_of_changes_builds_once(tmp_path: Path) -> None:
+    calls: list[frozenset[Path] | None] = []
+    handler = _BaseEventHandler(_DELAY, lambda paths, _: calls.append(paths))
+    paths = [tmp_path / f"file{i}.tex" for i in range(5)]
+
+    for path in paths:
+        handler.dispatch(FileModifiedEvent(str(path)))
+    _wait_for(lambda: len(calls) > 0)
+    sleep(10 * _DELAY)
+
+    assert calls == [frozenset(paths)]
+
+
+def test_change_during_build_cancels_and_rebuilds_all_changes(
+    tmp_path: Path,
+) -> None:
+    calls: list[frozenset[Path] | None] = []
+    started = Event()
+
+    def build(paths: frozenset[Path] | None, cancel_event: Event) -> None:
+        calls.append(paths)
+        if len(calls) == 1:
+            started.set()
+            assert cancel_event.wait(5)
+            msg = "build cancelled"
+            raise BuildCancelledError(msg)
+
+    handler = _BaseEventHandler(_DELAY, build)
+    first, second = tmp_path / "first.tex", tmp_path / "second.tex"
+
+    handler.dispatch(FileModifiedEvent(str(first)))
+    assert started.wait(5)
+    handler.dispatch(FileModifiedEvent(str(second)))
+    _wait_for(lambda: len(calls) > 1)
+    sleep(10 * _DELAY)
+
+    assert calls == [frozenset([first]), frozenset([first, second])]
+
+
+def test_reads_do_not_trigger_builds(tmp_path: Path) -> None:
+    calls: list[frozenset[Path] | None] = []
+    handler = _BaseEventHandler(_DELAY, lambda paths, _: calls.append(paths))
+
+    handler.dispatch(FileOpenedEvent(str(tmp_path / "file.tex")))
+    handler.dispatch(FileClosedNoWriteEvent(str(tmp_path / "file.tex")))
+    handler.dispatch(DirModifiedEvent(str(tmp_path)))
+    sleep(10 * _DELAY)
+
+    assert calls == []
+
+
+@mark.parametrize("content", [None, "{}", '{"other/deck": 10.0}'])
+def test_shards_without_known_timings_are_assigned_by_hash(
+    tmp_path: Path, caplog: LogCaptureFixture, content: str | None
+) -> None:
+    decks_settings = [_deck_settings(tmp_path / f"deck{i}") for i in range(20)]
+    timings = tmp_path / "timings.json"
+    if content is not None:
+        timings.write_text(content)
+
+    shard = _select_shard(decks_settings, tmp_path, 2, 3, timings)
+
+    assert shard == _select_shard(decks_settings, tmp_path, 2, 3)
+    assert "No timing recorded" in caplog.text